@@ -0,0 +1,93 @@
+import argparse
+import json
+import math
+from typing import Dict, Iterable, List, Optional
+
+from normalize import normalize_batch
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def load_listings(filenames: Iterable[str]) -> List[Dict]:
+    """Read listings from JSON array dumps and JSON Lines files"""
+    listings = []
+    for filename in filenames:
+        with open(filename, 'r', encoding='utf-8') as f:
+            if filename.endswith('.jsonl'):
+                listings.extend(json.loads(line) for line in f if line.strip())
+            else:
+                listings.extend(json.load(f))
+    return listings
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linearly interpolated percentile of an already sorted list"""
+    position = (len(sorted_values) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Count, mean and percentiles of a list of numbers"""
+    values = sorted(values)
+    summary = {'count': len(values), 'mean': sum(values) / len(values)}
+    for q in PERCENTILES:
+        summary['median' if q == 50 else f"p{q}"] = percentile(values, q)
+    return summary
+
+
+def group_stats(columns: Dict[str, list], by: str = 'district', metric: str = 'price',
+                min_count: int = 1) -> Dict[str, Dict[str, float]]:
+    """
+    Aggregate a numeric column per group
+
+    Args:
+        columns: Output of normalize.normalize_batch
+        by: Grouping column ('district', 'city', 'category')
+        metric: Numeric column ('price', 'area', 'price_per_m2')
+        min_count: Drop groups with fewer values
+
+    Returns:
+        Mapping of group to summary, largest groups first
+    """
+    groups: Dict[str, List[float]] = {}
+    for key, value in zip(columns[by], columns[metric]):
+        if value is not None:
+            groups.setdefault(key or 'N/A', []).append(value)
+
+    stats = {key: summarize(values) for key, values in groups.items() if len(values) >= min_count}
+    return dict(sorted(stats.items(), key=lambda item: -item[1]['count']))
+
+
+def overall_stats(columns: Dict[str, list], metric: str = 'price') -> Optional[Dict[str, float]]:
+    """Summary of a numeric column over the whole batch, None if it has no values"""
+    values = [v for v in columns[metric] if v is not None]
+    return summarize(values) if values else None
+
+
+def print_table(stats: Dict[str, Dict[str, float]], by: str, metric: str):
+    """Print group stats as an aligned table"""
+    headers = ['count', 'p10', 'p25', 'median', 'p75', 'p90', 'mean']
+    print(f"{by:<24}" + ''.join(f"{h:>10}" for h in headers) + f"   ({metric})")
+    for key, summary in stats.items():
+        print(f"{key[:24]:<24}" + ''.join(
+            f"{summary[h]:>10.0f}" if h == 'count' else f"{summary[h]:>10.1f}" for h in headers))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Price statistics over scraped OLX listings")
+    parser.add_argument('files', nargs='+', help="Listing JSON / JSONL files")
+    parser.add_argument('--by', choices=['district', 'city', 'category'], default='district', help="Grouping column")
+    parser.add_argument('--metric', choices=['price', 'area', 'price_per_m2'], default='price', help="Numeric column")
+    parser.add_argument('--min-count', type=int, default=3, help="Hide groups with fewer listings")
+    args = parser.parse_args(argv)
+
+    listings = load_listings(args.files)
+    columns = normalize_batch(listings)
+    print(f"{len(listings)} listings, {sum(v is not None for v in columns[args.metric])} with {args.metric}\n")
+    print_table(group_stats(columns, args.by, args.metric, args.min_count), args.by, args.metric)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from main import OLXScraper
+from dead_letter import DeadLetterQueue, merge_recovered
+from response_archive import ResponseArchive
+from search_index import SearchIndex
+from near_duplicates import NearDuplicateIndex
+from images import ImageCache, ImagePipeline
+from http_pool import HTTPClientPool
+from seen_store import SeenIDStore
+from output_index import append_indexed_jsonl, write_indexed_json
+from profiling import NullProfiler, SamplingProfiler, StageProfiler
+from snapshot_diff import DIFF_FIELDS, listing_key
+from sitemap import DEFAULT_LISTING_PATTERN, SitemapReader, listings_from_urls, parse_since
+
+DEFAULT_URL = "https://www.olx.pl/nieruchomosci/garaze-parkingi/wynajem/warszawa/?search%5Bphotos%5D=1&search%5Border%5D=created_at:desc"
+
+
+def build_scraper(args, filter_seen: bool = True) -> OLXScraper:
+    """
+    Create a scraper with the archive and dead-letter queue requested on the command line
+
+    With filter_seen, listings in the --seen-store are dropped from results
+    pages and detail scheduling; watch mode passes False and consults the
+    store itself.
+    """
+    archive = None
+    if args.archive:
+        archive = ResponseArchive(os.path.join(args.output_dir, f"{args.prefix}_responses.warc.gz"))
+    dead_letters = DeadLetterQueue(os.path.join(args.output_dir, f"{args.prefix}_dead_letters.json"))
+    dedup = NearDuplicateIndex(skip_details=not args.fetch_repost_details)
+    return OLXScraper(archive=archive, dead_letters=dead_letters, dedup=dedup, profiler=args.profiler,
+                      pool=args.http_pool, seen_ids=args.seen_ids if filter_seen else None)
+
+
+def write_listings(listings: List[Dict], args, kind: str):
+    """Send listings to the configured sink and the search index, if any"""
+    if args.search_index is not None:
+        with args.profiler.stage('index'):
+            print(f"Indexed {args.search_index.add_listings(listings)} listings in {args.search_index.filename}")
+
+    with args.profiler.stage('save'):
+        _write_sink(listings, args, kind)
+
+
+def remember_listings(listings: List[Dict], args):
+    """Record emitted listings in the seen-ID store so later runs skip them"""
+    if args.seen_ids is not None:
+        print(f"Recorded {args.seen_ids.add_many(listing_key(l) for l in listings)} new IDs in {args.seen_ids.filename}")
+
+
+def _write_sink(listings: List[Dict], args, kind: str):
+    if args.sink == 'stdout':
+        for listing in listings:
+            sys.__stdout__.write(json.dumps(listing, ensure_ascii=False) + '\n')
+        sys.__stdout__.flush()
+        return
+
+    if args.sink == 'jsonl':
+        filename = os.path.join(args.output_dir, f"{args.prefix}_{kind}.jsonl")
+        append_indexed_jsonl(listings, filename)
+        print(f"Appended {len(listings)} records to {filename}")
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(args.output_dir, f"{args.prefix}_{kind}_{timestamp}.json")
+    write_indexed_json(listings, filename)
+    print(f"Data saved to {filename}")
+
+
+def collect_listings(scraper: OLXScraper, args) -> List[Dict]:
+    """Scrape every configured URL, dropping listings already seen under another URL"""
+    listings = []
+    seen_keys = set()
+    for url in args.url:
+        for listing in scraper.scrape_url(url, max_pages=args.max_pages):
+            key = listing_key(listing)
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            listings.append(listing)
+            if len(listings) >= args.max_records:
+                return listings
+    return listings
+
+
+def add_details(scraper: OLXScraper, listings: List[Dict], args) -> List[Dict]:
+    """Fetch details for up to --max-detailed listings, then run the retry pass"""
+    detailed_listings = scraper.get_details_batch(listings[:args.max_detailed],
+                                                  concurrency=args.concurrency, delay=args.delay)
+    recovered = scraper.retry_dead_letters()
+    return merge_recovered(detailed_listings, recovered)
+
+
+def fetch_images(scraper: OLXScraper, listings: List[Dict], args):
+    """Download listing images into the cache when --images is given"""
+    if not args.images:
+        return
+    with args.profiler.stage('images'):
+        cache = ImageCache(args.images, max_bytes=args.images_max_mb * 1024 * 1024)
+        ImagePipeline(cache, session=scraper.session, concurrency=args.image_concurrency).process(listings)
+
+
+def run_scrape(args):
+    """One-shot scrape of the configured URLs"""
+    scraper = build_scraper(args)
+    listings = collect_listings(scraper, args)
+    print(f"Found {len(listings)} basic listings")
+    if not args.detailed:
+        fetch_images(scraper, listings, args)
+    write_listings(listings, args, 'basic')
+
+    if args.detailed and listings:
+        detailed_listings = add_details(scraper, listings, args)
+        print(f"Found {len(detailed_listings)} detailed listings")
+        fetch_images(scraper, detailed_listings, args)
+        write_listings(detailed_listings, args, 'detailed')
+    # Every listing went to the basic output, including those past
+    # --max-detailed; remembering only some of them would stop the next
+    # run's pagination before reaching the rest
+    remember_listings(listings, args)
+
+
+def watch_cycle(scraper: OLXScraper, seen: Dict[str, tuple], args) -> List[Dict]:
+    """
+    Poll the configured URLs once and return new or changed listings
+
+    `seen` maps listing keys to their DIFF_FIELDS values from the last time
+    they were emitted. A listing not yet tracked in this process but found
+    in the --seen-store was emitted by an earlier run: it becomes the
+    baseline for later changes instead of being reported as added.
+    """
+    listings = collect_listings(scraper, args)
+    untracked = [l for l in listings if listing_key(l) not in seen]
+    if args.seen_ids is not None and untracked:
+        known = args.seen_ids.contains_many(listing_key(l) for l in untracked)
+        for listing, was_seen in zip(untracked, known):
+            if was_seen:
+                seen[listing_key(listing)] = tuple(listing.get(field) for field in DIFF_FIELDS)
+
+    changes = []
+    for listing in listings:
+        key = listing_key(listing)
+        fingerprint = tuple(listing.get(field) for field in DIFF_FIELDS)
+        if seen.get(key) == fingerprint:
+            continue
+        change = 'changed' if key in seen else 'added'
+        seen[key] = fingerprint
+        changes.append({**listing, 'change': change})
+    return changes
+
+
+def run_watch(args):
+    """
+    Re-poll the configured URLs forever, emitting only new or changed listings
+
+    The scraper (and with it the requests.Session connection pool) and the
+    seen-listing state live for the whole process, so each cycle costs only
+    the listing pages themselves.
+    """
+    # Changed listings must still be paginated and detailed, so the seen
+    # store only decides what counts as added (see watch_cycle)
+    scraper = build_scraper(args, filter_seen=False)
+    # listing key -> tuple of DIFF_FIELDS values from the last time it was emitted
+    seen: Dict[str, tuple] = {}
+    cycle = 0
+
+    try:
+        while True:
+            cycle += 1
+            print(f"\n=== Watch cycle {cycle} ({datetime.now().strftime('%H:%M:%S')}) ===")
+            # Changed listings need fresh details, so the per-run frontier starts empty
+            scraper.reset_frontier()
+
+            changes = watch_cycle(scraper, seen, args)
+            print(f"Cycle {cycle}: {len(changes)} new or changed listings ({len(seen)} tracked)")
+            if changes:
+                if args.detailed:
+                    changes = add_details(scraper, changes, args)
+                fetch_images(scraper, changes, args)
+                write_listings(changes, args, 'changes')
+                remember_listings(changes, args)
+
+            sleep_for = max(0.0, args.interval + random.uniform(-args.jitter, args.jitter))
+            print(f"Next poll in {sleep_for:.0f}s")
+            time.sleep(sleep_for)
+    except KeyboardInterrupt:
+        print(f"\nWatch stopped after {cycle} cycles")
+
+
+def run_sitemap(args):
+    """
+    Discover listings from XML sitemaps and fetch their detail pages
+
+    Sitemap entries are streamed straight into detail fetching in batches of
+    --max-detailed, so pagination through search results is skipped
+    entirely and only ads modified since --since are requested.
+    """
+    scraper = build_scraper(args)
+    reader = SitemapReader(session=scraper.session)
+    sitemaps = args.sitemap or reader.discover()
+    if not sitemaps:
+        print("No sitemaps found in robots.txt")
+        return
+    since = parse_since(args.since) if args.since else None
+
+    def discovered_urls():
+        for sitemap_url in sitemaps:
+            yield from reader.iter_listing_urls(sitemap_url, since=since, pattern=args.pattern)
+
+    urls = discovered_urls()
+    total = 0
+    while total < args.max_records:
+        batch = listings_from_urls(urls, min(args.max_detailed, args.max_records - total))
+        if not batch:
+            break
+        total += len(batch)
+        detailed_listings = add_details(scraper, batch, args)
+        fetch_images(scraper, detailed_listings, args)
+        write_listings(detailed_listings, args, 'sitemap')
+        remember_listings(detailed_listings, args)
+
+    print(f"Sitemaps: {reader.stats['sitemaps']} files, {reader.stats['bytes'] / 1024:.0f} KB, "
+          f"{reader.stats['urls']} entries, {reader.stats['failed']} failed, {total} listings fetched")
+
+
+def add_search_arguments(parser: argparse.ArgumentParser, max_pages: int):
+    """Options of the commands that page through search results (scrape and watch)"""
+    parser.add_argument('--url', action='append', help="OLX search URL (repeatable; defaults to Warsaw parking)")
+    parser.add_argument('--max-pages', type=int, default=max_pages, help="Maximum result pages per URL")
+    parser.add_argument('--detailed', action='store_true', help="Fetch detail pages")
+
+
+def add_common_arguments(parser: argparse.ArgumentParser, sink: str):
+    """Options shared by every command"""
+    parser.add_argument('--max-records', type=int, default=300, help="Maximum basic listings per run or cycle")
+    parser.add_argument('--max-detailed', type=int, default=50, help="Maximum detail pages per run or cycle")
+    parser.add_argument('--concurrency', type=int, default=1, help="Parallel detail fetches")
+    parser.add_argument('--delay', type=float, default=3.0, help="Seconds each detail worker waits between fetches")
+    parser.add_argument('--sink', choices=['json', 'jsonl', 'stdout'], default=sink, help="Where listings are written")
+    parser.add_argument('--output-dir', default=os.getcwd(), help="Directory for output files")
+    parser.add_argument('--prefix', default='parking_listings', help="Output filename prefix")
+    parser.add_argument('--archive', action='store_true', help="Archive raw responses for re-extraction")
+    parser.add_argument('--fetch-repost-details', action='store_true', help="Fetch details for likely reposts too")
+    parser.add_argument('--images', metavar='DIR', help="Download listing images into this content-addressed cache")
+    parser.add_argument('--images-max-mb', type=int, default=1024, help="Image cache size limit in MB")
+    parser.add_argument('--image-concurrency', type=int, default=4, help="Parallel image downloads")
+    parser.add_argument('--profile', action='store_true', help="Time each pipeline stage")
+    parser.add_argument('--profile-sample', action='store_true', help="Also sample stacks every 5 ms and write flamegraph data (implies --profile)")
+    parser.add_argument('--index', help="SQLite search index updated with every batch of listings")
+    parser.add_argument('--max-connections', type=int, default=10, help="Keep-alive connections per host shared by all workers")
+    parser.add_argument('--seen-store', help="Skip listings recorded in this seen-ID file by earlier runs, and record new ones")
+    parser.add_argument('--dns-ttl', type=float, default=300, help="Seconds DNS answers are cached (0 disables)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Headless OLX scraper")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scrape_parser = subparsers.add_parser('scrape', help="Scrape once and exit")
+    add_search_arguments(scrape_parser, max_pages=20)
+    add_common_arguments(scrape_parser, sink='json')
+
+    watch_parser = subparsers.add_parser('watch', help="Poll on an interval, emitting new or changed listings")
+    add_search_arguments(watch_parser, max_pages=2)
+    add_common_arguments(watch_parser, sink='jsonl')
+    watch_parser.add_argument('--interval', type=float, default=900, help="Seconds between polls")
+    watch_parser.add_argument('--jitter', type=float, default=60, help="Random +/- seconds added to each interval")
+
+    sitemap_parser = subparsers.add_parser('sitemap', help="Discover listings from sitemaps and fetch their details")
+    add_common_arguments(sitemap_parser, sink='jsonl')
+    sitemap_parser.add_argument('--sitemap', action='append', help="Sitemap or sitemap index URL (repeatable; defaults to robots.txt)")
+    sitemap_parser.add_argument('--since', help="Only listings modified since this date or age (e.g. 2024-05-01, 7d, 12h)")
+    sitemap_parser.add_argument('--pattern', default=DEFAULT_LISTING_PATTERN, help="Regex a listing URL must match")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    if args.command != 'sitemap' and not args.url:
+        args.url = [DEFAULT_URL]
+    args.search_index = SearchIndex(args.index) if args.index else None
+    args.seen_ids = SeenIDStore(args.seen_store) if args.seen_store else None
+    args.http_pool = HTTPClientPool(max_per_host=args.max_connections, dns_ttl=args.dns_ttl)
+    if args.sink == 'stdout':
+        # Keep stdout clean for records; progress messages go to stderr
+        sys.stdout = sys.stderr
+
+    args.profiler = StageProfiler() if args.profile or args.profile_sample else NullProfiler()
+    sampler = None
+    if args.profile_sample:
+        sampler = SamplingProfiler(args.profiler)
+        sampler.start()
+
+    try:
+        if args.command == 'watch':
+            run_watch(args)
+        elif args.command == 'sitemap':
+            run_sitemap(args)
+        else:
+            run_scrape(args)
+    finally:
+        if args.seen_ids is not None:
+            args.seen_ids.close()
+        print(f"\n=== CONNECTIONS ===\n{args.http_pool.report()}")
+        if sampler is not None:
+            sampler.stop()
+        if isinstance(args.profiler, StageProfiler):
+            print("\n=== PROFILE ===")
+            print(args.profiler.report())
+        if sampler is not None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            sampler.write_folded(os.path.join(args.output_dir, f"{args.prefix}_profile_{timestamp}.folded"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# HTTP statuses that mean the listing is gone; retrying them only burns budget
+PERMANENT_STATUS_CODES = {404, 410}
+
+
+class DeadLetterQueue:
+    """
+    Persistent queue of detail fetches that failed
+
+    Entries are keyed by listing URL and saved as a JSON file, so failures
+    from one run are picked up by the retry pass of the next. Entries that
+    will never be retried (gone listings, attempts used up) are moved to a
+    JSON Lines archive on save, so the queue file stays small.
+    """
+
+    def __init__(self, filename: str = 'dead_letters.json', max_attempts: int = 5):
+        self.filename = filename
+        self.archive_filename = os.path.splitext(filename)[0] + '_archive.jsonl'
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def add(self, url: str, error: Exception, listing: Optional[Dict] = None):
+        """Record a failed fetch, bumping the attempt count if already queued"""
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        now = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with self._lock:
+            entry = self.entries.get(url) or {
+                'url': url,
+                'attempts': 0,
+                'first_failed': now,
+                'listing': listing or {},
+            }
+            entry['attempts'] += 1
+            entry['last_failed'] = now
+            entry['error_class'] = type(error).__name__
+            entry['error'] = str(error)[:500]
+            entry['status_code'] = status
+            entry['permanent'] = status in PERMANENT_STATUS_CODES
+            if listing:
+                entry['listing'] = listing
+            self.entries[url] = entry
+            self._save()
+
+    def remove(self, url: str):
+        """Drop an entry after a successful retry"""
+        with self._lock:
+            if self.entries.pop(url, None) is not None:
+                self._save()
+
+    def pending(self) -> List[Dict]:
+        """Entries still worth retrying, oldest failure first"""
+        with self._lock:
+            entries = [e for e in self.entries.values() if not self._is_spent(e)]
+        return sorted(entries, key=lambda e: e['last_failed'])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _is_spent(self, entry: Dict) -> bool:
+        return entry['permanent'] or entry['attempts'] >= self.max_attempts
+
+    def _save(self):
+        """Archive spent entries, then write the queue atomically so a crash never leaves a truncated file"""
+        spent = [url for url, entry in self.entries.items() if self._is_spent(entry)]
+        if spent:
+            with open(self.archive_filename, 'a', encoding='utf-8') as f:
+                for url in spent:
+                    f.write(json.dumps(self.entries.pop(url), ensure_ascii=False) + '\n')
+        tmp_filename = self.filename + '.tmp'
+        with open(tmp_filename, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_filename, self.filename)
+
+
+def merge_recovered(listings: List[Dict], recovered: Dict[str, Dict]) -> List[Dict]:
+    """
+    Merge listings recovered by a retry pass back into detailed listings
+
+    Listings from this run are updated in place; recoveries of failures
+    queued by earlier runs are appended.
+    """
+    merged = []
+    seen_urls = set()
+    for listing in listings:
+        url = listing.get('url')
+        seen_urls.add(url)
+        merged.append({**listing, **recovered[url]} if url in recovered else listing)
+    merged.extend(l for url, l in recovered.items() if url not in seen_urls)
+    return merged
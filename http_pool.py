@@ -0,0 +1,158 @@
+import socket
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pl-PL,pl;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+class DNSCache:
+    """
+    TTL cache of host name lookups for one HTTPClientPool
+
+    Every new connection resolves its host again; with a handful of hosts
+    (www.olx.pl and the image CDN) a short TTL removes those lookups while
+    still following DNS changes during long watch runs.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache: Dict[Tuple[str, int], Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> str:
+        """Address to connect to; socket.gaierror propagates on failure"""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        with self._lock:
+            self._cache[key] = (now + self.ttl, address)
+        return address
+
+
+def _connection_class(base, client: 'HTTPClientPool', scheme: str):
+    """Connection class that counts every socket it opens and resolves through the client's DNS cache"""
+
+    class ClientConnection(base):
+        def _new_conn(self):
+            # urllib3 also lands here when it silently reconnects a dropped
+            # socket, so this counts real TCP connects
+            client._count('connections', f"{scheme}://{self.host}")
+            if client.dns_cache is not None:
+                try:
+                    self._dns_host = client.dns_cache.resolve(self.host, self.port)
+                except socket.gaierror:
+                    # Let urllib3 resolve again and raise its usual error
+                    self._dns_host = self.host
+            return super()._new_conn()
+
+    return ClientConnection
+
+
+class _ClientAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools use the client's connection classes"""
+
+    def __init__(self, client: 'HTTPClientPool', **kwargs):
+        self.client = client
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        http_connection = _connection_class(HTTPConnectionPool.ConnectionCls, self.client, 'http')
+        https_connection = _connection_class(HTTPSConnectionPool.ConnectionCls, self.client, 'https')
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('ClientHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_connection}),
+            'https': type('ClientHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_connection}),
+        }
+
+
+class HTTPClientPool:
+    """
+    One requests.Session with sized keep-alive connection pools, shared by
+    every scraper, thread and GUI run in the process
+
+    max_per_host bounds the open connections to each host. Requests beyond
+    that wait for a free connection (pool_block) instead of opening a
+    throwaway one, so detail and image workers keep reusing warm TLS
+    connections. max_hosts is how many per-host pools are kept alive.
+    Host lookups go through this pool's own DNS cache unless dns_ttl is 0.
+
+    HTTP/2 is not available: requests and urllib3 only speak HTTP/1.1, so
+    reuse comes from keep-alive connections instead of multiplexing.
+    """
+
+    def __init__(self, max_per_host: int = 10, max_hosts: int = 10, dns_ttl: float = 300.0,
+                 headers: Optional[Dict[str, str]] = None):
+        self.max_per_host = max_per_host
+        self.dns_cache = DNSCache(dns_ttl) if dns_ttl > 0 else None
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self.session.hooks['response'].append(self._count_response)
+        self.adapter = _ClientAdapter(self, pool_connections=max_hosts, pool_maxsize=max_per_host, pool_block=True)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def _count(self, stat: str, host: str):
+        with self._stats_lock:
+            counts = self._stats.setdefault(host, {'requests': 0, 'connections': 0})
+            counts[stat] += 1
+
+    def _count_response(self, response, *args, **kwargs):
+        parts = urlsplit(response.url)
+        self._count('requests', f"{parts.scheme}://{parts.hostname}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-host requests and TCP connections opened"""
+        with self._stats_lock:
+            return {host: {**counts, 'reused': max(0, counts['requests'] - counts['connections'])}
+                    for host, counts in self._stats.items()}
+
+    def report(self) -> str:
+        """One line per host plus the DNS cache hit rate"""
+        lines = []
+        for host, s in sorted(self.stats().items()):
+            reuse = 100 * s['reused'] / s['requests'] if s['requests'] else 0
+            lines.append(f"{host}: {s['requests']} requests over {s['connections']} connections ({reuse:.0f}% reused)")
+        if self.dns_cache is not None and self.dns_cache.hits + self.dns_cache.misses:
+            lookups = self.dns_cache.hits + self.dns_cache.misses
+            lines.append(f"DNS cache: {self.dns_cache.hits}/{lookups} lookups served from cache")
+        return '\n'.join(lines) or "No HTTP requests made"
+
+    def close(self):
+        self.session.close()
+
+
+_default_pool: Optional[HTTPClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> HTTPClientPool:
+    """The process-wide pool used by scrapers that are not given one"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = HTTPClientPool()
+        return _default_pool
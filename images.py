@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from urls import listing_image_url, listing_key
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails are skipped without Pillow
+    Image = None
+
+THUMBNAIL_SIZE = (200, 200)
+
+
+def image_key(url: str) -> str:
+    """
+    Identity of an image independent of the requested size
+
+    OLX CDN URLs carry the size in path parameters (';s=200x0') or the
+    query string, so only host and path identify the photo.
+    """
+    parsed = urlparse(url if not url.startswith('//') else 'https:' + url)
+    return f"{parsed.netloc}{parsed.path}"
+
+
+def make_thumbnail(source: str, destination: str, size=THUMBNAIL_SIZE) -> bool:
+    """Write a JPEG thumbnail (runs in a worker process)"""
+    try:
+        with Image.open(source) as img:
+            img.thumbnail(size)
+            img.convert('RGB').save(destination, 'JPEG', quality=80)
+        return True
+    except Exception as e:
+        print(f"Thumbnail failed for {source}: {e}")
+        return False
+
+
+def _photo_urls(listing: Dict) -> List[str]:
+    """Absolute CDN URLs of a listing's photos, skipping placeholders"""
+    urls = [listing_image_url(url) for url in [listing.get('image_url')] + list(listing.get('images') or [])]
+    return [url for url in urls if url]
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+class ImageCache:
+    """
+    Content-addressed, size-bounded image store
+
+    Images are stored once per SHA-256 of their bytes; an index maps image
+    keys (see image_key) to hashes so a repost showing the same photo is a
+    cache hit without any download, and listing keys to their hashes so a
+    repost with re-uploaded photos can reuse the original's. When the images
+    and their thumbnails grow past max_bytes the least recently used images
+    are evicted.
+    """
+
+    def __init__(self, directory: str = 'image_cache', max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_filename = os.path.join(directory, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        self.keys: Dict[str, str] = {}
+        self.blobs: Dict[str, Dict] = {}
+        self.listings: Dict[str, List[str]] = {}
+        if os.path.exists(self.index_filename):
+            with open(self.index_filename, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.keys, self.blobs = index['keys'], index['blobs']
+            self.listings = index.get('listings', {})
+        for digest, blob in self.blobs.items():
+            if 'thumbnail_size' not in blob:
+                # Indexes written before thumbnails were counted
+                thumbnail = self.thumbnail_path(digest)
+                blob['thumbnail_size'] = os.path.getsize(thumbnail) if os.path.exists(thumbnail) else 0
+        self.total_bytes = sum(b['size'] + b['thumbnail_size'] for b in self.blobs.values())
+
+    def path(self, digest: str, suffix: str = '') -> str:
+        return os.path.join(self.directory, digest[:2], digest + suffix)
+
+    def thumbnail_path(self, digest: str) -> str:
+        return self.path(digest, '.thumb.jpg')
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Hash of a cached image for this URL, refreshing its LRU time"""
+        with self._lock:
+            digest = self.keys.get(image_key(url))
+            if digest is None or digest not in self.blobs:
+                return None
+            self.blobs[digest]['last_access'] = time.time()
+            return digest
+
+    def store(self, url: str, content: bytes) -> str:
+        """Store downloaded bytes, returning their hash"""
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            if digest not in self.blobs:
+                os.makedirs(os.path.dirname(self.path(digest)), exist_ok=True)
+                with open(self.path(digest), 'wb') as f:
+                    f.write(content)
+                self.blobs[digest] = {'size': len(content), 'thumbnail_size': 0, 'last_access': time.time()}
+                self.total_bytes += len(content)
+            self.keys[image_key(url)] = digest
+        return digest
+
+    def add_thumbnail(self, digest: str):
+        """Count a newly written thumbnail towards the cache size"""
+        size = os.path.getsize(self.thumbnail_path(digest))
+        with self._lock:
+            blob = self.blobs.get(digest)
+            if blob is not None:
+                self.total_bytes += size - blob['thumbnail_size']
+                blob['thumbnail_size'] = size
+
+    def listing_hashes(self, key: str) -> Optional[List[str]]:
+        """Image hashes recorded for a listing key, if all are still cached"""
+        with self._lock:
+            hashes = self.listings.get(key)
+            if hashes is None or any(digest not in self.blobs for digest in hashes):
+                return None
+            return list(hashes)
+
+    def set_listing_hashes(self, key: str, hashes: List[str]):
+        with self._lock:
+            self.listings[key] = list(hashes)
+
+    def evict(self):
+        """Drop least recently used images until the cache fits max_bytes"""
+        with self._lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            evicted = set()
+            for digest, blob in sorted(self.blobs.items(), key=lambda item: item[1]['last_access']):
+                if self.total_bytes <= self.max_bytes:
+                    break
+                for path in (self.path(digest), self.thumbnail_path(digest)):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self.total_bytes -= blob['size'] + blob['thumbnail_size']
+                evicted.add(digest)
+            for digest in evicted:
+                del self.blobs[digest]
+            self.keys = {k: d for k, d in self.keys.items() if d not in evicted}
+            self.listings = {k: hashes for k, hashes in self.listings.items() if not evicted.intersection(hashes)}
+            print(f"Evicted {len(evicted)} images from cache")
+
+    def save(self):
+        """Persist the index atomically"""
+        with self._lock:
+            tmp_filename = self.index_filename + '.tmp'
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
+                json.dump({'keys': self.keys, 'blobs': self.blobs, 'listings': self.listings}, f)
+            os.replace(tmp_filename, self.index_filename)
+
+
+class ImagePipeline:
+    """Download listing images concurrently into an ImageCache and make thumbnails"""
+
+    def __init__(self, cache: ImageCache, session: Optional[requests.Session] = None,
+                 concurrency: int = 4, rate_per_second: float = 5.0, thumbnails: bool = True):
+        self.cache = cache
+        self.session = session or requests.Session()
+        self.concurrency = concurrency
+        self.rate_limiter = RateLimiter(rate_per_second)
+        self.thumbnails = thumbnails and Image is not None
+        if thumbnails and Image is None:
+            print("Pillow is not installed, skipping thumbnails")
+        self.stats = {'cached': 0, 'downloaded': 0, 'failed': 0, 'reused': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _download(self, url: str) -> Optional[str]:
+        digest = self.cache.lookup(url)
+        if digest is not None:
+            self._count('cached')
+            return digest
+        self.rate_limiter.wait()
+        try:
+            response = self.session.get(url, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Image download failed for {url}: {e}")
+            self._count('failed')
+            return None
+        self._count('downloaded')
+        return self.cache.store(url, response.content)
+
+    def process(self, listings: List[Dict]) -> Dict[str, str]:
+        """
+        Fetch every image of the given listings
+
+        Sets 'image_hashes' on each listing and returns a URL to hash map.
+        A repost ('duplicate_of') of a listing whose images are known, from
+        this batch or an earlier run, gets the original's hashes without
+        downloading its own re-uploaded copies.
+        """
+        batch_keys = {listing_key(l) for l in listings if not l.get('duplicate_of') and _photo_urls(l)}
+        reposts, originals = [], []
+        for listing in listings:
+            original = listing.get('duplicate_of')
+            if original and (original in batch_keys or self.cache.listing_hashes(original) is not None):
+                reposts.append(listing)
+            else:
+                originals.append(listing)
+
+        urls = []
+        seen_keys = set()
+        for listing in originals:
+            for url in _photo_urls(listing):
+                if image_key(url) not in seen_keys:
+                    seen_keys.add(image_key(url))
+                    urls.append(url)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            digests = dict(zip(urls, executor.map(self._download, urls)))
+        by_key = {image_key(url): digest for url, digest in digests.items() if digest}
+
+        for listing in originals:
+            hashes = []
+            for url in _photo_urls(listing):
+                digest = by_key.get(image_key(url))
+                if digest and digest not in hashes:
+                    hashes.append(digest)
+            listing['image_hashes'] = hashes
+            if hashes:
+                self.cache.set_listing_hashes(listing_key(listing), hashes)
+        for listing in reposts:
+            listing['image_hashes'] = self.cache.listing_hashes(listing['duplicate_of']) or []
+            self._count('reused')
+
+        if self.thumbnails:
+            self._make_thumbnails(set(by_key.values()))
+        self.cache.evict()
+        self.cache.save()
+        print(f"Images: {self.stats['downloaded']} downloaded, {self.stats['cached']} from cache, "
+              f"{self.stats['failed']} failed, {self.stats['reused']} reposts reusing the original's")
+        return {url: digest for url, digest in digests.items() if digest}
+
+    def _make_thumbnails(self, digests):
+        """Generate missing thumbnails in a process pool"""
+        todo = [d for d in digests if not os.path.exists(self.cache.thumbnail_path(d))]
+        if not todo:
+            return
+        with ProcessPoolExecutor() as executor:
+            made = list(executor.map(make_thumbnail, [self.cache.path(d) for d in todo],
+                                     [self.cache.thumbnail_path(d) for d in todo]))
+        for digest, ok in zip(todo, made):
+            if ok:
+                self.cache.add_thumbnail(digest)
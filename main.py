@@ -3,22 +3,43 @@ from bs4 import BeautifulSoup
 import json
 import time
 import re
-from urllib.parse import urljoin, urlparse, parse_qs
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
 from typing import List, Dict, Optional
 
+from http_pool import default_pool
+from output_index import write_indexed_json
+from dead_letter import DeadLetterQueue, merge_recovered
+from near_duplicates import NearDuplicateIndex
+from normalize import normalize_batch
+from analytics import overall_stats
+from profiling import NullProfiler
+from urls import Frontier, canonical_listing_url, listing_id as url_listing_id, is_newest_first, listing_key, with_page
+
 class OLXScraper:
-    def __init__(self):
+    def __init__(self, archive=None, dead_letters=None, dedup=None, profiler=None, pool=None, seen_ids=None):
         self.base_url = "https://www.olx.pl"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pl-PL,pl;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        # Optional ResponseArchive; raw page bodies are appended to it when set
+        self.archive = archive
+        # Optional DeadLetterQueue; failed detail fetches are recorded there for retry
+        self.dead_letters = dead_letters
+        # Optional NearDuplicateIndex; reposted ads get a 'duplicate_of' link
+        self.dedup = dedup
+        # Detail URLs already fetched in this run, and their details
+        self.frontier = Frontier()
+        self.detail_cache: Dict[str, Dict] = {}
+        # Detail fetches in progress; later callers for the same URL wait on the event
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._detail_lock = threading.Lock()
+        # StageProfiler when --profile is on; the null profiler's stages are no-ops
+        self.profiler = profiler or NullProfiler()
+        # Shared HTTPClientPool; its session keeps connections warm across scrapers and runs
+        self.pool = pool or default_pool()
+        self.session = self.pool.session
+        # Optional SeenIDStore of listings collected in earlier runs; they are
+        # neither returned again nor scheduled for details
+        self.seen_ids = seen_ids
 
     def scrape_url(self, url: str, max_pages: int = 10) -> List[Dict]:
         """
@@ -32,12 +53,13 @@ class OLXScraper:
             List of listing dictionaries
         """
         listings = []
+        newest_first = is_newest_first(url)
         
         for page in range(1, max_pages + 1):
             print(f"\n--- Scraping page {page} ---")
             
             # Add page parameter to URL
-            page_url = f"{url}&page={page}" if '?' in url else f"{url}?page={page}"
+            page_url = with_page(url, page)
             page_listings = self._scrape_listings_page(page_url)
             
             if not page_listings:
@@ -46,13 +68,21 @@ class OLXScraper:
                 
             # Filter out invalid listings
             valid_listings = [l for l in page_listings if l.get('title') != 'N/A' and l.get('url')]
+            seen_before = len(valid_listings)
+            valid_listings = self._drop_seen(valid_listings)
+            seen_before -= len(valid_listings)
+            if seen_before and not valid_listings and newest_first:
+                # Results are newest first, so a page of known ads means the rest are known too
+                print(f"Every listing on page {page} was collected in an earlier run, stopping...")
+                break
             listings.extend(valid_listings)
+            reposts = self._mark_duplicates(valid_listings)
             
-            print(f"Page {page}: Found {len(page_listings)} total, {len(valid_listings)} valid listings")
+            print(f"Page {page}: Found {len(page_listings)} total, {len(valid_listings)} valid listings, {seen_before} seen before, {reposts} likely reposts")
             print(f"Total valid listings so far: {len(listings)}")
             
             # Longer delay to avoid rate limiting
-            time.sleep(2)
+            self._sleep(2)
         
         return listings
 
@@ -80,17 +110,22 @@ class OLXScraper:
         for i, listing in enumerate(basic_listings[:max_detailed]):
             if not listing.get('url'):
                 continue
+            
+            if not self.needs_details(listing):
+                print(f"Skipping details for listing {i+1}, repost of {listing['duplicate_of']}")
+                detailed_listings.append(listing)
+                continue
                 
             print(f"Getting details for listing {i+1}/{min(max_detailed, len(basic_listings))}: {listing.get('title', 'N/A')[:50]}...")
             
             try:
-                details = self.get_listing_details(listing['url'])
+                details = self.get_listing_details(listing['url'], listing)
                 # Merge basic info with detailed info
                 detailed_listing = {**listing, **details}
                 detailed_listings.append(detailed_listing)
                 
                 # Respectful delay
-                time.sleep(3)
+                self._sleep(3)
                 
             except Exception as e:
                 print(f"Error getting details for listing {i+1}: {e}")
@@ -98,8 +133,53 @@ class OLXScraper:
                 detailed_listings.append(listing)
                 continue
         
+        if self.dead_letters is not None:
+            recovered = self.retry_dead_letters()
+            detailed_listings = merge_recovered(detailed_listings, recovered)
+        
         return detailed_listings
 
+    def get_details_batch(self, listings: List[Dict], concurrency: int = 1, delay: float = 3.0) -> List[Dict]:
+        """
+        Get detailed information for several listings
+        
+        Args:
+            listings: Basic listings to enrich
+            concurrency: Number of detail pages fetched in parallel
+            delay: Seconds each worker waits after a fetch
+        
+        Returns:
+            Listings merged with their details, in input order, minus
+            listings recorded in the seen-ID store
+        """
+        def fetch(listing):
+            if not self.needs_details(listing):
+                return listing
+            details = self.get_listing_details(listing['url'], listing)
+            self._sleep(delay)
+            return {**listing, **details}
+        
+        listings = self._drop_seen([l for l in listings if l.get('url')])
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            return list(executor.map(fetch, listings))
+
+    def _drop_seen(self, listings: List[Dict]) -> List[Dict]:
+        """Remove listings recorded in the seen-ID store, with one bulk lookup"""
+        if self.seen_ids is None or not listings:
+            return listings
+        seen = self.seen_ids.contains_many(listing_key(l) for l in listings)
+        return [l for l, was_seen in zip(listings, seen) if not was_seen]
+
+    def _mark_duplicates(self, listings: List[Dict]) -> int:
+        """Link likely reposts to the listing seen first, returning how many were found"""
+        if self.dedup is None:
+            return 0
+        return self.dedup.mark(listings)
+
+    def needs_details(self, listing: Dict) -> bool:
+        """False for reposts whose detail fetch should be skipped"""
+        return not (listing.get('duplicate_of') and self.dedup is not None and self.dedup.skip_details)
+
     def search_listings(self, query: str, location: str = "", max_pages: int = 5) -> List[Dict]:
         """
         Search for listings on OLX.pl
@@ -120,82 +200,37 @@ class OLXScraper:
             search_url += f"{location}/"
         
         for page in range(1, max_pages + 1):
-            page_url = f"{search_url}?page={page}"
+            page_url = with_page(search_url, page)
             page_listings = self._scrape_listings_page(page_url)
             
             if not page_listings:
                 break
                 
             listings.extend(page_listings)
-            time.sleep(1)  # Be respectful to the server
+            self._sleep(1)  # Be respectful to the server
         
         return listings
 
+    def _fetch(self, url: str, timeout: int, kind: str) -> requests.Response:
+        """GET a page and archive the raw body if an archive is configured"""
+        with self.profiler.stage('fetch'):
+            response = self.session.get(url, timeout=timeout)
+            response.raise_for_status()
+        if self.archive is not None:
+            with self.profiler.stage('archive'):
+                self.archive.append(url, kind, response.status_code, response.content)
+        return response
+
+    def _sleep(self, seconds: float):
+        """Politeness delay, timed as its own stage"""
+        with self.profiler.stage('sleep'):
+            time.sleep(seconds)
+
     def _scrape_listings_page(self, url: str) -> List[Dict]:
         """Scrape a single page of listings with improved selectors"""
         try:
             print(f"Fetching: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Debug: save HTML to file to inspect structure (only for first page)
-            if 'page=1' in url or 'page=' not in url:
-                with open(f'debug_page.html', 'w', encoding='utf-8') as f:
-                    f.write(soup.prettify())
-                print("HTML saved to debug_page.html for inspection")
-            
-            listings = []
-            
-            # Try multiple selectors for listing containers
-            selectors = [
-                '[data-cy="l-card"]',
-                '[data-testid="l-card"]', 
-                'div[data-cy="l-card"]',
-                '.css-1sw7q4x',  # Common OLX class
-                '[data-cy="listing-ad-title"]',
-                '.offer-wrapper',
-                'article',
-                'div[class*="listing"]',
-            ]
-            
-            listing_containers = []
-            for selector in selectors:
-                containers = soup.select(selector)
-                if containers:
-                    print(f"Found {len(containers)} containers with selector: {selector}")
-                    listing_containers = containers
-                    break
-            
-            if not listing_containers:
-                print("No listing containers found with any selector")
-                # Try to find any divs that might contain listings
-                all_divs = soup.find_all('div')
-                print(f"Total divs found: {len(all_divs)}")
-                
-                # Look for divs with links and text that might be listings
-                potential_listings = []
-                for div in all_divs:
-                    if div.find('a') and (div.find('h3') or div.find('h4') or div.find('h6')):
-                        potential_listings.append(div)
-                
-                print(f"Found {len(potential_listings)} potential listing divs")
-                listing_containers = potential_listings[:50]  # Take first 50 to avoid too many
-            
-            for i, container in enumerate(listing_containers):
-                try:
-                    listing_data = self._extract_listing_data_improved(container)
-                    if listing_data:
-                        listings.append(listing_data)
-                        if i < 3:  # Debug first 3 listings
-                            print(f"Listing {i+1}: {listing_data.get('title', 'N/A')[:50]}...")
-                except Exception as e:
-                    print(f"Error extracting listing {i+1}: {e}")
-                    continue
-            
-            print(f"Successfully extracted {len(listings)} listings from page")
-            return listings
+            return self._fetch_listings_page(url)
             
         except requests.RequestException as e:
             print(f"Request error for {url}: {e}")
@@ -204,6 +239,76 @@ class OLXScraper:
             print(f"Unexpected error for {url}: {e}")
             return []
 
+    def _fetch_listings_page(self, url: str) -> List[Dict]:
+        """Fetch and parse a results page, letting errors propagate"""
+        response = self._fetch(url, timeout=10, kind='listing_page')
+        
+        with self.profiler.stage('parse'):
+            soup = BeautifulSoup(response.content, 'html.parser')
+        
+        # Debug: save HTML to file to inspect structure (only for first page)
+        if 'page=1' in url or 'page=' not in url:
+            with self.profiler.stage('debug_dump'):
+                with open(f'debug_page.html', 'w', encoding='utf-8') as f:
+                    f.write(soup.prettify())
+            print("HTML saved to debug_page.html for inspection")
+        
+        with self.profiler.stage('extract'):
+            return self._parse_listings_page(soup)
+
+    def _parse_listings_page(self, soup) -> List[Dict]:
+        """Extract listings from an already parsed results page"""
+        listings = []
+        
+        # Try multiple selectors for listing containers
+        selectors = [
+            '[data-cy="l-card"]',
+            '[data-testid="l-card"]', 
+            'div[data-cy="l-card"]',
+            '.css-1sw7q4x',  # Common OLX class
+            '[data-cy="listing-ad-title"]',
+            '.offer-wrapper',
+            'article',
+            'div[class*="listing"]',
+        ]
+        
+        listing_containers = []
+        for selector in selectors:
+            containers = soup.select(selector)
+            if containers:
+                print(f"Found {len(containers)} containers with selector: {selector}")
+                listing_containers = containers
+                break
+        
+        if not listing_containers:
+            print("No listing containers found with any selector")
+            # Try to find any divs that might contain listings
+            all_divs = soup.find_all('div')
+            print(f"Total divs found: {len(all_divs)}")
+            
+            # Look for divs with links and text that might be listings
+            potential_listings = []
+            for div in all_divs:
+                if div.find('a') and (div.find('h3') or div.find('h4') or div.find('h6')):
+                    potential_listings.append(div)
+            
+            print(f"Found {len(potential_listings)} potential listing divs")
+            listing_containers = potential_listings[:50]  # Take first 50 to avoid too many
+        
+        for i, container in enumerate(listing_containers):
+            try:
+                listing_data = self._extract_listing_data_improved(container)
+                if listing_data:
+                    listings.append(listing_data)
+                    if i < 3:  # Debug first 3 listings
+                        print(f"Listing {i+1}: {listing_data.get('title', 'N/A')[:50]}...")
+            except Exception as e:
+                print(f"Error extracting listing {i+1}: {e}")
+                continue
+        
+        print(f"Successfully extracted {len(listings)} listings from page")
+        return listings
+
     def _extract_listing_data_improved(self, container) -> Optional[Dict]:
         """Extract data with improved selectors and multiple fallbacks"""
         try:
@@ -230,10 +335,7 @@ class OLXScraper:
             if link_elem:
                 relative_url = link_elem.get('href')
                 if relative_url:
-                    if relative_url.startswith('http'):
-                        url = relative_url
-                    else:
-                        url = urljoin(self.base_url, relative_url)
+                    url = canonical_listing_url(relative_url, self.base_url)
             
             # Price - try multiple selectors
             price = "N/A"
@@ -306,76 +408,147 @@ class OLXScraper:
     def _extract_id_from_url(self, url: str) -> str:
         """Extract listing ID from URL"""
         try:
-            # OLX URLs typically end with ID-*.html or ID*.html
-            match = re.search(r'ID([a-zA-Z0-9]+)', url)
-            if match:
-                return match.group(1)
-            
-            # Alternative pattern
-            match = re.search(r'-([a-zA-Z0-9]+)\.html', url)
-            if match:
-                return match.group(1)
-                
-            return ""
-        except:
+            return url_listing_id(url)
+        except Exception:
             return ""
 
-    def get_listing_details(self, listing_url: str) -> Dict:
-        """Get detailed information for a specific listing"""
+    def get_listing_details(self, listing_url: str, listing: Optional[Dict] = None) -> Dict:
+        """
+        Get detailed information for a specific listing, at most once per run
+
+        A caller asking for a URL that another thread is already fetching
+        waits for that fetch and shares its result.
+        """
+        listing_url = canonical_listing_url(listing_url, self.base_url)
+        with self._detail_lock:
+            if listing_url in self.detail_cache:
+                return self.detail_cache[listing_url]
+            in_flight = self._in_flight.get(listing_url)
+            if in_flight is None:
+                if not self.frontier.add(listing_url):
+                    # Already fetched and failed in this run; it is in the dead-letter queue
+                    return {}
+                self._in_flight[listing_url] = threading.Event()
+        
+        if in_flight is not None:
+            in_flight.wait()
+            return self.detail_cache.get(listing_url, {})
+        
         try:
-            response = self.session.get(listing_url, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract detailed information with multiple selectors
-            details = {
-                'detailed_title': self._get_text_by_multiple_selectors(soup, [
-                    'h1', '[data-cy="ad_title"]', '.css-r9zjja-Text'
-                ]),
-                'detailed_price': self._get_text_by_multiple_selectors(soup, [
-                    '[data-testid="ad-price-container"]', 
-                    '.css-8gi6ch', 
-                    '.css-1uwck7i',
-                    'h3[data-testid="ad-price-container"]'
-                ]),
-                'description': self._get_text_by_multiple_selectors(soup, [
-                    '[data-cy="ad_description"]',
-                    '.css-g5mtl5-Text',
-                    '.offer-description',
-                    '.description'
-                ]),
-                'detailed_location': self._get_text_by_multiple_selectors(soup, [
-                    '[data-testid="location-date"]',
-                    '.css-veheph',
-                    '.location-date'
-                ]),
-                'seller_name': self._get_text_by_multiple_selectors(soup, [
-                    '[data-testid="seller-name"]',
-                    '.css-1cxvtlc',
-                    '.seller-name'
-                ]),
-                'seller_type': self._get_text_by_multiple_selectors(soup, [
-                    '[data-testid="seller-type"]',
-                    '.css-12hdxwj'
-                ]),
-                'phone_number': self._extract_phone_number(soup),
-                'images': self._extract_images(soup),
-                'attributes': self._extract_attributes(soup),
-                'posted_date': self._extract_posted_date(soup),
-                'viewed_count': self._extract_view_count(soup),
-                'safety_tips': self._extract_safety_tips(soup),
-                'listing_features': self._extract_listing_features(soup)
-            }
-            
+            details = self._fetch_listing_details(listing_url)
+            self.detail_cache[listing_url] = details
             return details
             
         except requests.RequestException as e:
             print(f"Error getting listing details: {e}")
+            self._record_failure(listing_url, e, listing)
             return {}
         except Exception as e:
             print(f"Unexpected error getting listing details: {e}")
+            self._record_failure(listing_url, e, listing)
             return {}
+        finally:
+            with self._detail_lock:
+                self._in_flight.pop(listing_url).set()
+
+    def reset_frontier(self):
+        """Start a new run: allow every detail URL to be fetched again"""
+        self.frontier.clear()
+        self.detail_cache.clear()
+
+    def _fetch_listing_details(self, listing_url: str) -> Dict:
+        """Fetch and parse a listing page, letting errors propagate"""
+        with self.profiler.stage('detail'):
+            response = self._fetch(listing_url, timeout=15, kind='detail')
+            with self.profiler.stage('parse'):
+                soup = BeautifulSoup(response.content, 'html.parser')
+            with self.profiler.stage('extract'):
+                return self._parse_listing_details(soup)
+
+    def _record_failure(self, listing_url: str, error: Exception, listing: Optional[Dict] = None):
+        """Queue a failed detail fetch for the deferred retry pass"""
+        if self.dead_letters is not None:
+            self.dead_letters.add(listing_url, error, listing)
+
+    def retry_dead_letters(self, max_requests: int = 20, delay: float = 5.0) -> Dict[str, Dict]:
+        """
+        Retry queued detail fetches under their own request budget
+        
+        Args:
+            max_requests: Maximum number of retries in this pass
+            delay: Seconds to wait between retries
+        
+        Returns:
+            Mapping of listing URL to recovered detailed listing
+        """
+        if self.dead_letters is None:
+            return {}
+        
+        pending = self.dead_letters.pending()[:max_requests]
+        if not pending:
+            return {}
+        
+        print(f"\n--- Retrying {len(pending)} failed detail fetches ({len(self.dead_letters)} queued) ---")
+        
+        recovered = {}
+        for entry in pending:
+            url = entry['url']
+            try:
+                details = self._fetch_listing_details(url)
+                recovered[url] = {**entry.get('listing', {}), **details}
+                self.dead_letters.remove(url)
+                print(f"Recovered details for {url}")
+            except Exception as e:
+                print(f"Retry failed for {url}: {type(e).__name__}: {e}")
+                self.dead_letters.add(url, e)
+            self._sleep(delay)
+        
+        print(f"Recovered {len(recovered)}/{len(pending)} listings, {len(self.dead_letters)} still queued")
+        return recovered
+
+    def _parse_listing_details(self, soup) -> Dict:
+        """Extract detail fields from an already parsed listing page"""
+        # Extract detailed information with multiple selectors
+        details = {
+            'detailed_title': self._get_text_by_multiple_selectors(soup, [
+                'h1', '[data-cy="ad_title"]', '.css-r9zjja-Text'
+            ]),
+            'detailed_price': self._get_text_by_multiple_selectors(soup, [
+                '[data-testid="ad-price-container"]', 
+                '.css-8gi6ch', 
+                '.css-1uwck7i',
+                'h3[data-testid="ad-price-container"]'
+            ]),
+            'description': self._get_text_by_multiple_selectors(soup, [
+                '[data-cy="ad_description"]',
+                '.css-g5mtl5-Text',
+                '.offer-description',
+                '.description'
+            ]),
+            'detailed_location': self._get_text_by_multiple_selectors(soup, [
+                '[data-testid="location-date"]',
+                '.css-veheph',
+                '.location-date'
+            ]),
+            'seller_name': self._get_text_by_multiple_selectors(soup, [
+                '[data-testid="seller-name"]',
+                '.css-1cxvtlc',
+                '.seller-name'
+            ]),
+            'seller_type': self._get_text_by_multiple_selectors(soup, [
+                '[data-testid="seller-type"]',
+                '.css-12hdxwj'
+            ]),
+            'phone_number': self._extract_phone_number(soup),
+            'images': self._extract_images(soup),
+            'attributes': self._extract_attributes(soup),
+            'posted_date': self._extract_posted_date(soup),
+            'viewed_count': self._extract_view_count(soup),
+            'safety_tips': self._extract_safety_tips(soup),
+            'listing_features': self._extract_listing_features(soup)
+        }
+        
+        return details
 
     def _get_text_by_multiple_selectors(self, soup, selectors: List[str]) -> str:
         """Try multiple CSS selectors to get text"""
@@ -524,13 +697,14 @@ class OLXScraper:
 
     def save_to_json(self, data: List[Dict], filename: str = 'olx_listings.json'):
         """Save scraped data to JSON file"""
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with self.profiler.stage('save'):
+            write_indexed_json(data, filename)
         print(f"Data saved to {filename}")
 
 # Example usage
 def main():
-    scraper = OLXScraper()
+    scraper = OLXScraper(dead_letters=DeadLetterQueue('parking_listings_dead_letters.json'),
+                         dedup=NearDuplicateIndex())
     
     # Scrape the specific parking/garage URL
     parking_url = "https://www.olx.pl/nieruchomosci/garaze-parkingi/wynajem/warszawa/?search%5Bphotos%5D=1&search%5Border%5D=created_at:desc"
@@ -546,7 +720,7 @@ def main():
     # If we don't have enough, try without photo filter to get more results
     if len(listings) < target_records:
         print(f"\nOnly found {len(listings)} listings with photos. Trying without photo filter...")
-        backup_url = "https://www.olx.pl/nieruchomosci/garaze-parkingi/wynajem/warszawa/?search%5Bphotos%5D=1&search%5Border%5D=created_at:desc"
+        backup_url = "https://www.olx.pl/nieruchomosci/garaze-parkingi/wynajem/warszawa/?search%5Border%5D=created_at:desc"
         additional_listings = scraper.scrape_url(backup_url, max_pages=30)
         
         # Combine and deduplicate by URL
@@ -581,17 +755,22 @@ def main():
     for i, listing in enumerate(listings[:detailed_count]):
         if not listing.get('url'):
             continue
+        
+        if not scraper.needs_details(listing):
+            print(f"Skipping details for listing {i+1}, repost of {listing['duplicate_of']}")
+            detailed_listings.append(listing)
+            continue
             
         print(f"Getting details for listing {i+1}/{detailed_count}: {listing.get('title', 'N/A')[:50]}...")
         
         try:
-            details = scraper.get_listing_details(listing['url'])
+            details = scraper.get_listing_details(listing['url'], listing)
             # Merge basic info with detailed info
             detailed_listing = {**listing, **details}
             detailed_listings.append(detailed_listing)
             
             # Respectful delay
-            time.sleep(3)
+            scraper._sleep(3)
             
         except Exception as e:
             print(f"Error getting details for listing {i+1}: {e}")
@@ -599,6 +778,10 @@ def main():
             detailed_listings.append(listing)
             continue
     
+    # Deferred retry pass for failures from this run and earlier ones
+    recovered = scraper.retry_dead_letters()
+    detailed_listings = merge_recovered(detailed_listings, recovered)
+    
     print(f"Found {len(detailed_listings)} detailed parking/garage listings")
     
     # Save detailed listings
@@ -617,6 +800,10 @@ def main():
         # Show price distribution
         prices_with_values = [l['price'] for l in listings if l['price'] != 'N/A']
         print(f"Listings with price information: {len(prices_with_values)}")
+        price_stats = overall_stats(normalize_batch(listings), 'price')
+        if price_stats:
+            print(f"Numeric prices: {price_stats['count']}, median {price_stats['median']:.0f} zł "
+                  f"(p10 {price_stats['p10']:.0f} zł, p90 {price_stats['p90']:.0f} zł)")
         
         print("\nSample basic listing:")
         print(json.dumps(listings[0], indent=2, ensure_ascii=False))
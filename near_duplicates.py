@@ -0,0 +1,120 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from normalize import normalize_text, parse_price
+from urls import listing_image_url, listing_key
+
+HASH_BITS = 64
+# 4 bands of 16 bits: two hashes within Hamming distance 3 must agree
+# exactly on at least one band, so band lookups find every such pair
+BANDS = 4
+BAND_BITS = HASH_BITS // BANDS
+MAX_DISTANCE = 3
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def listing_features(listing: Dict) -> List[Tuple[str, int]]:
+    """Weighted features describing what a listing is, independent of its ID"""
+    features = [(f"t:{word}", 1) for word in re.findall(r'\w+', normalize_text(listing.get('title', '')))]
+
+    location = listing.get('location', 'N/A')
+    if location and location != 'N/A':
+        features.append((f"l:{normalize_text(location)}", 2))
+
+    price = parse_price(listing.get('price', ''))
+    if price is not None:
+        features.append((f"p:{round(price)}", 2))
+
+    image_url = listing_image_url(listing.get('image_url', ''))
+    if image_url:
+        # The CDN path identifies the photo; query strings only pick a size
+        features.append((f"i:{urlparse(image_url).path}", 3))
+
+    return features
+
+
+def simhash(features: List[Tuple[str, int]]) -> int:
+    """64-bit SimHash of weighted features"""
+    totals = [0] * HASH_BITS
+    for feature, weight in features:
+        h = _feature_hash(feature)
+        for bit in range(HASH_BITS):
+            totals[bit] += weight if (h >> bit) & 1 else -weight
+    return sum(1 << bit for bit in range(HASH_BITS) if totals[bit] > 0)
+
+
+class NearDuplicateIndex:
+    """
+    In-memory LSH index that links reposted ads to the listing seen first
+
+    Sellers repost the same garage under a new ID, so ID/URL dedup misses
+    it. Listings are SimHashed over title, location, price and image, and
+    the hash is split into bands; a new listing is compared only against
+    listings sharing a band.
+    """
+
+    def __init__(self, max_distance: int = MAX_DISTANCE, skip_details: bool = True):
+        self.max_distance = max_distance
+        # Whether scrapers should skip detail fetches for linked reposts
+        self.skip_details = skip_details
+        self.hashes: Dict[str, int] = {}
+        self.bands: List[Dict[int, List[str]]] = [{} for _ in range(BANDS)]
+
+    def _band_values(self, h: int) -> List[int]:
+        mask = (1 << BAND_BITS) - 1
+        return [(h >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+    def find(self, listing: Dict) -> Optional[str]:
+        """Return the ID of an indexed near-duplicate with a different ID, if any"""
+        key = listing_key(listing)
+        h = simhash(listing_features(listing))
+        best_key, best_distance = None, self.max_distance + 1
+        for band, value in enumerate(self._band_values(h)):
+            for candidate in self.bands[band].get(value, ()):
+                if candidate == key:
+                    continue
+                distance = bin(h ^ self.hashes[candidate]).count('1')
+                if distance < best_distance:
+                    best_key, best_distance = candidate, distance
+        return best_key
+
+    def add(self, listing: Dict) -> Optional[str]:
+        """
+        Index a listing and return the ID it duplicates, if any
+
+        A listing linked to an earlier one is not indexed itself, so chains
+        of reposts all point at the original.
+        """
+        key = listing_key(listing)
+        if not key:
+            return None
+        if key in self.hashes:
+            return None
+
+        original = self.find(listing)
+        if original is not None:
+            return original
+
+        h = simhash(listing_features(listing))
+        self.hashes[key] = h
+        for band, value in enumerate(self._band_values(h)):
+            self.bands[band].setdefault(value, []).append(key)
+        return None
+
+    def mark(self, listings: List[Dict]) -> int:
+        """Set 'duplicate_of' on reposts in a batch, returning how many were found"""
+        found = 0
+        for listing in listings:
+            original = self.add(listing)
+            if original is not None:
+                listing['duplicate_of'] = original
+                found += 1
+        return found
+
+    def __len__(self) -> int:
+        return len(self.hashes)
@@ -0,0 +1,140 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_price(price: str) -> Optional[float]:
+    """Turn a display price like '1 200 zł' into a number, None if not numeric"""
+    if not price or price == 'N/A':
+        return None
+    match = re.search(r'\d[\d\s.,]*', price)
+    if not match:
+        return None
+    digits = re.sub(r'\s', '', match.group(0)).rstrip('.,')
+    # "1.200,50" / "1 200,50" -> 1200.50
+    if ',' in digits:
+        digits = digits.replace('.', '').replace(',', '.')
+    elif digits.count('.') > 1:
+        digits = digits.replace('.', '')
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+# NFKD strips most Polish diacritics, but ł has no decomposition
+_POLISH_FOLD = str.maketrans({'ł': 'l', 'Ł': 'l'})
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and strip diacritics so 'Mokotów' and 'mokotow' compare equal"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text.translate(_POLISH_FOLD))
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+_AREA_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*(?:m2|m²|m\.kw|mkw|metr)', re.IGNORECASE)
+_NUMBER_PATTERN = re.compile(r'^\s*(-?\d[\d\s]*(?:[.,]\d+)?)\s*([^\d\s].*)?$')
+
+# Price texts that are not a number, mapped to a price kind
+_PRICE_KINDS = (
+    ('zamieni', 'exchange'),
+    ('za darmo', 'free'),
+    ('oddam', 'free'),
+)
+
+
+def price_kind(price: str) -> str:
+    """Classify a display price as 'amount', 'exchange', 'free' or 'unknown'"""
+    text = normalize_text(price)
+    for marker, kind in _PRICE_KINDS:
+        if marker in text:
+            return kind
+    return 'amount' if parse_price(price) is not None else 'unknown'
+
+
+def parse_area(text: str) -> Optional[float]:
+    """Area in m² from text like '18 m²' or 'Garaż 17,5m2', None if absent"""
+    if not text:
+        return None
+    match = _AREA_PATTERN.search(text)
+    return float(match.group(1).replace(',', '.')) if match else None
+
+
+def attribute_key(key: str) -> str:
+    """'Powierzchnia użytkowa' -> 'powierzchnia_uzytkowa'"""
+    return re.sub(r'\W+', '_', normalize_text(key)).strip('_')
+
+
+def normalize_attributes(attributes: Dict[str, str]) -> Dict[str, object]:
+    """
+    Normalize keys and parse numeric attribute values
+
+    Values that start with a number ('18 m²', '2 szt.') become floats;
+    anything else stays as normalized text.
+    """
+    normalized = {}
+    for key, value in (attributes or {}).items():
+        match = _NUMBER_PATTERN.match(value or '')
+        if match:
+            normalized[attribute_key(key)] = float(re.sub(r'\s', '', match.group(1)).replace(',', '.'))
+        else:
+            normalized[attribute_key(key)] = normalize_text(value).strip()
+    return normalized
+
+
+def listing_area(listing: Dict) -> Optional[float]:
+    """Area from the 'powierzchnia' attribute, falling back to the title and description"""
+    for key, value in (listing.get('attributes') or {}).items():
+        if attribute_key(key).startswith('powierzchnia'):
+            area = parse_area(value) or parse_price(value)
+            if area:
+                return area
+    return parse_area(listing.get('title', '')) or parse_area(listing.get('description', ''))
+
+
+def split_location(location: str) -> Tuple[Optional[str], Optional[str]]:
+    """'Warszawa, Mokotów' -> ('warszawa', 'mokotow')"""
+    if not location or location == 'N/A':
+        return None, None
+    parts = [normalize_text(p).strip() for p in location.split(',') if p.strip()]
+    if not parts:
+        return None, None
+    return parts[0], parts[-1]
+
+
+def normalize_batch(listings: List[Dict]) -> Dict[str, list]:
+    """
+    Parse a batch of listings into columns
+
+    Returns a dict of equal-length lists (id, price, price_kind, area,
+    price_per_m2, city, district, category, attributes), one entry per
+    listing, ready for per-column aggregation.
+    """
+    columns = {name: [] for name in ('id', 'price', 'price_kind', 'area', 'price_per_m2',
+                                     'city', 'district', 'category', 'attributes')}
+    for listing in listings:
+        price_text = listing.get('price', 'N/A')
+        if price_text == 'N/A':
+            price_text = listing.get('detailed_price', 'N/A')
+        kind = price_kind(price_text)
+        price = parse_price(price_text) if kind == 'amount' else None
+        area = listing_area(listing)
+        location = listing.get('location', 'N/A')
+        if location == 'N/A':
+            location = listing.get('detailed_location', 'N/A')
+        city, district = split_location(location)
+        attributes = normalize_attributes(listing.get('attributes'))
+        category = attributes.get('typ') or attributes.get('rodzaj')
+
+        columns['id'].append(listing.get('id') or listing.get('url'))
+        columns['price'].append(price)
+        columns['price_kind'].append(kind)
+        columns['area'].append(area)
+        columns['price_per_m2'].append(price / area if price is not None and area else None)
+        columns['city'].append(city)
+        columns['district'].append(district)
+        columns['category'].append(category if isinstance(category, str) else None)
+        columns['attributes'].append(attributes)
+    return columns
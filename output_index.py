@@ -0,0 +1,179 @@
+import argparse
+import bisect
+import json
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from urls import listing_key
+
+
+def _index_filename(filename: str) -> str:
+    return filename + '.idx'
+
+
+def _write_index(filename: str, entries: List[Dict], mode: str = 'w'):
+    with open(_index_filename(filename), mode, encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def write_indexed_json(listings: List[Dict], filename: str):
+    """
+    Write listings as an indented JSON array plus a sidecar offset index
+
+    The output is the same as json.dump(..., indent=2); each element is
+    written separately so its byte offset and length can be recorded in
+    '<filename>.idx'.
+    """
+    entries = []
+    with open(filename, 'wb') as f:
+        if not listings:
+            f.write(b'[]')
+        else:
+            f.write(b'[\n')
+            for i, listing in enumerate(listings):
+                if i:
+                    f.write(b',\n')
+                f.write(b'  ')
+                data = json.dumps(listing, ensure_ascii=False, indent=2).replace('\n', '\n  ').encode('utf-8')
+                entries.append({'id': listing_key(listing), 'offset': f.tell(), 'length': len(data)})
+                f.write(data)
+            f.write(b'\n]')
+    _write_index(filename, entries)
+
+
+def append_indexed_jsonl(listings: List[Dict], filename: str):
+    """Append listings to a JSON Lines file, extending its sidecar index"""
+    entries = []
+    with open(filename, 'ab') as f:
+        for listing in listings:
+            data = json.dumps(listing, ensure_ascii=False).encode('utf-8')
+            entries.append({'id': listing_key(listing), 'offset': f.tell(), 'length': len(data)})
+            f.write(data + b'\n')
+    _write_index(filename, entries, mode='a')
+
+
+def build_index(filename: str) -> int:
+    """Create the sidecar index for an output file written before indexing existed"""
+    entries = []
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if filename.endswith('.jsonl'):
+        offset = 0
+        for line in data.split(b'\n'):
+            if line.strip():
+                entries.append({'id': listing_key(json.loads(line)), 'offset': offset, 'length': len(line)})
+            offset += len(line) + 1
+    else:
+        # Walk the array element by element, converting character positions
+        # to byte offsets one segment at a time
+        text = data.decode('utf-8')
+        decoder = json.JSONDecoder()
+        position = text.index('[') + 1
+        byte_position = len(text[:position].encode('utf-8'))
+        while True:
+            start = position
+            while text[position] in ' \t\r\n,':
+                position += 1
+            if text[position] == ']':
+                break
+            byte_position += len(text[start:position].encode('utf-8'))
+            listing, end = decoder.raw_decode(text, position)
+            length = len(text[position:end].encode('utf-8'))
+            entries.append({'id': listing_key(listing), 'offset': byte_position, 'length': length})
+            byte_position += length
+            position = end
+    _write_index(filename, entries)
+    return len(entries)
+
+
+class OutputIndex:
+    """
+    Random access to listings across many output files by listing ID
+
+    Only the sidecar indexes are read up front. Data files are memory-mapped
+    on first use and a lookup decodes just the bytes of the requested
+    record. An ID found in several files (the same ad scraped on different
+    days) keeps every location, oldest file first.
+    """
+
+    def __init__(self, filenames: Iterable[str]):
+        self.locations: Dict[str, List[Tuple[str, int, int]]] = {}
+        self._maps: Dict[str, Tuple[object, mmap.mmap]] = {}
+        for filename in sorted(filenames, key=os.path.getmtime):
+            if not os.path.exists(_index_filename(filename)):
+                print(f"No index for {filename}, building one")
+                build_index(filename)
+            with open(_index_filename(filename), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.locations.setdefault(entry['id'], []).append(
+                            (filename, entry['offset'], entry['length']))
+        self.ids = sorted(self.locations)
+
+    def _read(self, location: Tuple[str, int, int]) -> Dict:
+        filename, offset, length = location
+        if filename not in self._maps:
+            f = open(filename, 'rb')
+            self._maps[filename] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return json.loads(self._maps[filename][1][offset:offset + length])
+
+    def get(self, listing_id: str) -> Optional[Dict]:
+        """Most recent record for an ID"""
+        locations = self.locations.get(listing_id)
+        return self._read(locations[-1]) if locations else None
+
+    def history(self, listing_id: str) -> List[Dict]:
+        """Every stored record for an ID, oldest first"""
+        return [self._read(location) for location in self.locations.get(listing_id, [])]
+
+    def range(self, first_id: str, last_id: str) -> Iterator[Dict]:
+        """Most recent records for IDs between first_id and last_id inclusive, in ID order"""
+        start = bisect.bisect_left(self.ids, first_id)
+        end = bisect.bisect_right(self.ids, last_id)
+        for listing_id in self.ids[start:end]:
+            yield self.get(listing_id)
+
+    def __contains__(self, listing_id: str) -> bool:
+        return listing_id in self.locations
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def close(self):
+        for f, mapped in self._maps.values():
+            mapped.close()
+            f.close()
+        self._maps.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up listings in scraped output files by ID")
+    parser.add_argument('files', nargs='+', help="JSON or JSONL output files")
+    parser.add_argument('--id', action='append', help="Listing ID to print (repeatable)")
+    parser.add_argument('--range', nargs=2, metavar=('FIRST', 'LAST'), help="Print every listing with an ID in this range")
+    parser.add_argument('--history', action='store_true', help="Print every stored version of --id listings")
+    parser.add_argument('--build', action='store_true', help="Rebuild the sidecar indexes and exit")
+    args = parser.parse_args()
+
+    if args.build:
+        for filename in args.files:
+            print(f"{filename}: indexed {build_index(filename)} listings")
+        return
+
+    index = OutputIndex(args.files)
+    print(f"{len(index)} listing IDs across {len(args.files)} files")
+    records = []
+    for listing_id in args.id or []:
+        records.extend(index.history(listing_id) if args.history else [index.get(listing_id)])
+    if args.range:
+        records.extend(index.range(*args.range))
+    for record in records:
+        print(json.dumps(record, ensure_ascii=False, indent=2))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class NullProfiler:
+    """Profiler stand-in used when profiling is off; stage() costs one call"""
+
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def current_stage(self, thread_id: int) -> Optional[str]:
+        return None
+
+
+class StageProfiler(NullProfiler):
+    """
+    Wall-clock timers for pipeline stages (fetch, parse, extract, detail, save...)
+
+    Stages nest: 'detail' contains 'fetch', 'parse' and 'extract'. Each stage
+    records its total time and its self time (total minus nested stages),
+    so the self times add up to the profiled wall time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stage_by_thread: Dict[int, str] = {}
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        thread_id = threading.get_ident()
+        # [name, start, time spent in nested stages]
+        frame = [name, time.perf_counter(), 0.0]
+        stack.append(frame)
+        self._stage_by_thread[thread_id] = name
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[1]
+            stack.pop()
+            if stack:
+                stack[-1][2] += elapsed
+                self._stage_by_thread[thread_id] = stack[-1][0]
+            else:
+                self._stage_by_thread.pop(thread_id, None)
+            with self._lock:
+                totals = self.totals.setdefault(name, {'count': 0, 'total': 0.0, 'self': 0.0})
+                totals['count'] += 1
+                totals['total'] += elapsed
+                totals['self'] += elapsed - frame[2]
+
+    def current_stage(self, thread_id: int) -> Optional[str]:
+        return self._stage_by_thread.get(thread_id)
+
+    def report(self) -> str:
+        """Per-stage breakdown table, largest self time first"""
+        wall = time.perf_counter() - self.started
+        lines = [f"{'stage':<12}{'calls':>8}{'total s':>10}{'self s':>10}{'self %':>8}{'avg ms':>10}"]
+        for name, t in sorted(self.totals.items(), key=lambda item: -item[1]['self']):
+            lines.append(f"{name:<12}{t['count']:>8}{t['total']:>10.2f}{t['self']:>10.2f}"
+                         f"{100 * t['self'] / wall if wall else 0:>7.1f}%{1000 * t['total'] / t['count']:>10.1f}")
+        lines.append(f"{'wall':<12}{'':>8}{wall:>10.2f}")
+        return '\n'.join(lines)
+
+
+class SamplingProfiler:
+    """
+    Background sampler that records folded stacks for a flamegraph
+
+    Every interval it snapshots the Python stack of every other thread via
+    sys._current_frames(). Stacks are prefixed with the active pipeline
+    stage and written in the folded format read by flamegraph.pl and
+    speedscope.
+    """
+
+    def __init__(self, stages: Optional[NullProfiler] = None, interval: float = 0.005):
+        self.stages = stages or NullProfiler()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    module = code.co_filename.rsplit('/', 1)[-1].rsplit('\\', 1)[-1]
+                    stack.append(f"{module}:{code.co_name}")
+                    frame = frame.f_back
+                stage = self.stages.current_stage(thread_id) or 'other'
+                self.samples[';'.join([f"[{stage}]"] + stack[::-1])] += 1
+
+    def write_folded(self, filename: str):
+        """Write 'frame;frame;frame count' lines"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Flamegraph samples ({sum(self.samples.values())}) saved to {filename}")
@@ -0,0 +1,137 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from main import OLXScraper
+
+
+class ResponseArchive:
+    """
+    Append-only archive of raw HTTP response bodies
+
+    Every record is stored as its own gzip member (a JSON header line followed
+    by the body), so the data file is a valid concatenated .gz stream, much
+    like a WARC.gz. A JSON Lines sidecar index maps each record to its byte
+    offset and compressed length for random access.
+    """
+
+    def __init__(self, filename: str = 'responses.warc.gz'):
+        self.filename = filename
+        self.index_filename = filename + '.idx'
+        self._lock = threading.Lock()
+
+    def append(self, url: str, kind: str, status: int, body: bytes) -> Dict:
+        """Compress and append one response, returning its index entry"""
+        header = {
+            'url': url,
+            'kind': kind,
+            'status': status,
+            'fetched_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        record = gzip.compress(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n' + body)
+
+        with self._lock:
+            with open(self.filename, 'ab') as f:
+                offset = f.tell()
+                f.write(record)
+            entry = {**header, 'offset': offset, 'length': len(record)}
+            with open(self.index_filename, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    def iter_index(self) -> Iterator[Dict]:
+        """Yield index entries in archive order"""
+        if not os.path.exists(self.index_filename):
+            return
+        with open(self.index_filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def read(self, offset: int, length: int) -> Tuple[Dict, bytes]:
+        """Return (header, body) for the record at the given offset"""
+        with open(self.filename, 'rb') as f:
+            f.seek(offset)
+            raw = gzip.decompress(f.read(length))
+        header, _, body = raw.partition(b'\n')
+        return json.loads(header), body
+
+
+# Per-process scraper used only for its extractors; it never touches the network
+_extractor = None
+
+
+def _reextract_record(args: Tuple[str, Dict]) -> Tuple[str, str, object]:
+    """Re-run the current extractors over one archived response"""
+    global _extractor
+    if _extractor is None:
+        _extractor = OLXScraper()
+
+    archive_filename, entry = args
+    header, body = ResponseArchive(archive_filename).read(entry['offset'], entry['length'])
+    soup = BeautifulSoup(body, 'html.parser')
+
+    if header['kind'] == 'listing_page':
+        return header['kind'], header['url'], _extractor._parse_listings_page(soup)
+    return header['kind'], header['url'], _extractor._parse_listing_details(soup)
+
+
+def re_extract(archive_filename: str, workers: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Regenerate listings from an archive without any network access
+
+    Args:
+        archive_filename: Path of the archive data file
+        workers: Number of extractor processes (defaults to CPU count)
+
+    Returns:
+        Tuple of (basic listings, detailed listings)
+    """
+    archive = ResponseArchive(archive_filename)
+    tasks = [(archive_filename, entry) for entry in archive.iter_index()]
+    print(f"Re-extracting {len(tasks)} archived responses...")
+
+    basic_by_url = {}
+    details_by_url = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map() keeps archive order, so a later fetch of the same URL wins
+        for kind, url, result in executor.map(_reextract_record, tasks, chunksize=16):
+            if kind == 'listing_page':
+                for listing in result:
+                    if listing.get('title') != 'N/A' and listing.get('url'):
+                        basic_by_url[listing['url']] = listing
+            elif result:
+                details_by_url[url] = result
+
+    basic_listings = list(basic_by_url.values())
+    detailed_listings = [{**basic_by_url.get(url, {'url': url}), **details}
+                         for url, details in details_by_url.items()]
+    return basic_listings, detailed_listings
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Re-extract listings from a raw response archive")
+    parser.add_argument('archive', help="Archive data file (e.g. responses.warc.gz)")
+    parser.add_argument('--workers', type=int, default=None, help="Extractor processes")
+    parser.add_argument('--prefix', default='parking_listings', help="Output filename prefix")
+    args = parser.parse_args(argv)
+
+    basic_listings, detailed_listings = re_extract(args.archive, args.workers)
+
+    scraper = OLXScraper()
+    scraper.save_to_json(basic_listings, f"{args.prefix}_basic_reextracted.json")
+    if detailed_listings:
+        scraper.save_to_json(detailed_listings, f"{args.prefix}_detailed_reextracted.json")
+    print(f"Basic listings: {len(basic_listings)}, detailed listings: {len(detailed_listings)}")
+
+
+if __name__ == "__main__":
+    main()
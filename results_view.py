@@ -0,0 +1,210 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List, Optional
+
+from normalize import parse_price
+
+COLUMNS = (
+    ('title', "Title", 330),
+    ('price', "Price", 100),
+    ('location', "Location", 200),
+    ('date', "Date", 100),
+)
+
+
+class ResultsTable(ttk.Frame):
+    """
+    Virtualized Treeview over an in-memory list of listings
+
+    All rows live in plain Python lists; the Treeview only ever holds the
+    rows that fit on screen, so the widget cost stays constant no matter how
+    many listings are loaded. Sorting and filtering work on a precomputed
+    index of numeric prices and lowercased locations.
+    """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.rows: List[Dict] = []
+        self.row_by_url: Dict[str, int] = {}
+        # Index columns, parallel to self.rows
+        self.prices: List[Optional[float]] = []
+        self.locations: List[str] = []
+        # Row numbers currently shown, after filter and sort
+        self.view: List[int] = []
+        self.offset = 0
+        self.visible_rows = 20
+        self.sort_column = None
+        self.sort_reverse = False
+        self.filter_location = ''
+        self.filter_min_price = None
+        self.filter_max_price = None
+
+        self.create_widgets()
+
+    def create_widgets(self):
+        """Create filter controls, the tree and its scrollbar"""
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        filter_frame = ttk.Frame(self)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+
+        ttk.Label(filter_frame, text="Location:").pack(side=tk.LEFT)
+        self.location_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.location_var, width=20).pack(side=tk.LEFT, padx=(5, 10))
+
+        ttk.Label(filter_frame, text="Price from:").pack(side=tk.LEFT)
+        self.min_price_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.min_price_var, width=8).pack(side=tk.LEFT, padx=(5, 5))
+
+        ttk.Label(filter_frame, text="to:").pack(side=tk.LEFT)
+        self.max_price_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.max_price_var, width=8).pack(side=tk.LEFT, padx=(5, 10))
+
+        ttk.Button(filter_frame, text="Filter", command=self.apply_filter).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(filter_frame, text="Clear", command=self.clear_filter).pack(side=tk.LEFT)
+
+        self.count_var = tk.StringVar(value="0 rows")
+        ttk.Label(filter_frame, textvariable=self.count_var).pack(side=tk.RIGHT)
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in COLUMNS], show='headings',
+                                 height=self.visible_rows, selectmode='browse')
+        for key, heading, width in COLUMNS:
+            self.tree.heading(key, text=heading, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=width, anchor=tk.W)
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_to(self.offset - e.delta // 120 * 3))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_to(self.offset + 3))
+
+    def add_listings(self, listings: List[Dict]):
+        """Add or update a batch of listings (main thread only)"""
+        for listing in listings:
+            url = listing.get('url', '')
+            row = self.row_by_url.get(url) if url else None
+            if row is not None:
+                # Detailed data arriving for a row we already have
+                self.rows[row] = {**self.rows[row], **listing}
+                self.prices[row] = parse_price(self.rows[row].get('price', ''))
+                self.locations[row] = self.rows[row].get('location', '').lower()
+                continue
+
+            row = len(self.rows)
+            self.rows.append(listing)
+            self.prices.append(parse_price(listing.get('price', '')))
+            self.locations.append(listing.get('location', '').lower())
+            if url:
+                self.row_by_url[url] = row
+            if self.sort_column is None and self._matches(row):
+                self.view.append(row)
+
+        if self.sort_column is not None:
+            self._rebuild_view()
+        else:
+            self.render()
+
+    def clear(self):
+        """Drop all rows"""
+        self.rows, self.prices, self.locations, self.view = [], [], [], []
+        self.row_by_url = {}
+        self.offset = 0
+        self.render()
+
+    def apply_filter(self):
+        """Read the filter entries and rebuild the view"""
+        self.filter_location = self.location_var.get().strip().lower()
+        self.filter_min_price = parse_price(self.min_price_var.get())
+        self.filter_max_price = parse_price(self.max_price_var.get())
+        self.offset = 0
+        self._rebuild_view()
+
+    def clear_filter(self):
+        """Reset the filter entries and show every row"""
+        self.location_var.set('')
+        self.min_price_var.set('')
+        self.max_price_var.set('')
+        self.apply_filter()
+
+    def sort_by(self, column: str):
+        """Sort by a column, toggling direction on repeated clicks"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self._rebuild_view()
+
+    def _matches(self, row: int) -> bool:
+        """Check a row against the active filter"""
+        if self.filter_location and self.filter_location not in self.locations[row]:
+            return False
+        if self.filter_min_price is not None or self.filter_max_price is not None:
+            price = self.prices[row]
+            if price is None:
+                return False
+            if self.filter_min_price is not None and price < self.filter_min_price:
+                return False
+            if self.filter_max_price is not None and price > self.filter_max_price:
+                return False
+        return True
+
+    def _rebuild_view(self):
+        """Recompute filtered and sorted row numbers from the index"""
+        view = [row for row in range(len(self.rows)) if self._matches(row)]
+        if self.sort_column == 'price':
+            # Rows without a numeric price always go last
+            priced = [r for r in view if self.prices[r] is not None]
+            unpriced = [r for r in view if self.prices[r] is None]
+            priced.sort(key=lambda r: self.prices[r], reverse=self.sort_reverse)
+            view = priced + unpriced
+        elif self.sort_column == 'location':
+            view.sort(key=lambda r: self.locations[r], reverse=self.sort_reverse)
+        elif self.sort_column is not None:
+            view.sort(key=lambda r: str(self.rows[r].get(self.sort_column, '')).lower(), reverse=self.sort_reverse)
+        self.view = view
+        self.render()
+
+    def on_resize(self, event):
+        """Fit the number of materialized rows to the widget height"""
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        visible_rows = max(1, event.height // row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.tree.configure(height=visible_rows)
+            self.render()
+
+    def on_scroll(self, *args):
+        """Scrollbar callback for 'moveto' and 'scroll' commands"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.view)))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def scroll_to(self, offset: int):
+        """Move the window of materialized rows"""
+        offset = max(0, min(offset, len(self.view) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        """Materialize only the rows inside the visible window"""
+        self.offset = max(0, min(self.offset, len(self.view) - self.visible_rows))
+        self.tree.delete(*self.tree.get_children())
+        for row in self.view[self.offset:self.offset + self.visible_rows]:
+            listing = self.rows[row]
+            self.tree.insert('', tk.END, iid=str(row),
+                             values=[listing.get(key, '') for key, _, _ in COLUMNS])
+
+        total = len(self.view)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.count_var.set(f"{total} of {len(self.rows)} rows")
@@ -1,10 +1,23 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import threading
-import json
+import queue
 import os
 from datetime import datetime
 from main import OLXScraper
+from http_pool import HTTPClientPool
+from output_index import write_indexed_json
+from response_archive import ResponseArchive
+from dead_letter import DeadLetterQueue, merge_recovered
+from results_view import ResultsTable
+from near_duplicates import NearDuplicateIndex
+from urls import with_page
+
+# How often the UI drains worker events, and how many it handles per tick
+EVENT_TICK_MS = 100
+MAX_EVENTS_PER_TICK = 500
+# The activity log keeps only the most recent lines
+MAX_LOG_LINES = 2000
 
 class OLXScraperGUI:
     def __init__(self, root):
@@ -13,11 +26,19 @@ class OLXScraperGUI:
         self.root.geometry("800x700")
         self.root.configure(bg='#f0f0f0')
         
+        # One connection pool for the lifetime of the window, so every run
+        # reuses the warm connections of the previous one
+        self.http_pool = HTTPClientPool()
+        
         # Initialize scraper
-        self.scraper = OLXScraper()
+        self.scraper = OLXScraper(pool=self.http_pool)
         self.is_scraping = False
         self.current_thread = None
         
+        # Workers post ('log' | 'progress', payload) events here; only the
+        # Tk main loop touches widgets, in batches on a fixed tick
+        self.events = queue.Queue()
+        
         # Style configuration
         self.setup_styles()
         
@@ -26,6 +47,9 @@ class OLXScraperGUI:
         
         # Center window
         self.center_window()
+        
+        # Start draining worker events
+        self.root.after(EVENT_TICK_MS, self.drain_events)
     
     def setup_styles(self):
         """Configure custom styles"""
@@ -92,6 +116,14 @@ class OLXScraperGUI:
         self.max_detailed_var = tk.StringVar(value="50")
         ttk.Entry(options_frame, textvariable=self.max_detailed_var, width=10).grid(row=1, column=3, sticky=tk.W, padx=(0, 20), pady=(10, 0))
         
+        # Raw response archive for offline re-extraction
+        self.archive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Archive raw responses", variable=self.archive_var).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(10, 0))
+        
+        # Link reposted ads and skip their detail pages
+        self.skip_reposts_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="Skip reposted ads", variable=self.skip_reposts_var).grid(row=2, column=2, columnspan=2, sticky=tk.W, pady=(10, 0))
+        
         # Output Section
         output_frame = ttk.LabelFrame(main_frame, text="Output Settings", padding="10")
         output_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -144,16 +176,22 @@ class OLXScraperGUI:
         self.page_var = tk.StringVar(value="0")
         ttk.Label(stats_frame, textvariable=self.page_var, foreground='blue').grid(row=0, column=3, sticky=tk.W, padx=(5, 0))
         
-        # Log Section
-        log_frame = ttk.LabelFrame(main_frame, text="Activity Log", padding="10")
-        log_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        # Log and Results tabs
+        notebook = ttk.Notebook(main_frame)
+        notebook.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        main_frame.rowconfigure(6, weight=1)
+        
+        log_frame = ttk.Frame(notebook, padding="10")
         log_frame.columnconfigure(0, weight=1)
         log_frame.rowconfigure(0, weight=1)
-        main_frame.rowconfigure(6, weight=1)
+        notebook.add(log_frame, text="Activity Log")
         
         self.log_text = scrolledtext.ScrolledText(log_frame, height=10, wrap=tk.WORD)
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
+        self.results_table = ResultsTable(notebook, padding="10")
+        notebook.add(self.results_table, text="Results")
+        
         # Initial log message
         self.log("OLX Scraper initialized. Ready to start scraping.")
     
@@ -182,24 +220,62 @@ class OLXScraperGUI:
             subprocess.run(["xdg-open", path])
     
     def log(self, message):
-        """Add message to log with timestamp"""
+        """Queue a timestamped log message (safe to call from any thread)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        self.events.put(('log', f"[{timestamp}] {message}\n"))
     
     def clear_log(self):
         """Clear the log text"""
         self.log_text.delete(1.0, tk.END)
     
-    def update_progress(self, message, found=None, page=None):
-        """Update progress indicators"""
-        self.progress_var.set(message)
+    def update_progress(self, message=None, found=None, page=None):
+        """Queue a progress update (safe to call from any thread)"""
+        self.events.put(('progress', (message, found, page)))
+    
+    def add_results(self, listings):
+        """Queue listings for the results table (safe to call from any thread)"""
+        self.events.put(('results', list(listings)))
+    
+    def drain_events(self):
+        """Apply queued worker events in one batch (runs in main thread)"""
+        log_lines = []
+        results = []
+        message = found = page = None
+        try:
+            for _ in range(MAX_EVENTS_PER_TICK):
+                kind, payload = self.events.get_nowait()
+                if kind == 'log':
+                    log_lines.append(payload)
+                elif kind == 'results':
+                    results.extend(payload)
+                else:
+                    # Only the latest value of each indicator is worth drawing
+                    new_message, new_found, new_page = payload
+                    message = new_message if new_message is not None else message
+                    found = new_found if new_found is not None else found
+                    page = new_page if new_page is not None else page
+        except queue.Empty:
+            pass
+        
+        if message is not None:
+            self.progress_var.set(message)
         if found is not None:
             self.found_var.set(str(found))
         if page is not None:
             self.page_var.set(str(page))
-        self.root.update_idletasks()
+        
+        if results:
+            self.results_table.add_listings(results)
+        
+        if log_lines:
+            self.log_text.insert(tk.END, ''.join(log_lines[-MAX_LOG_LINES:]))
+            # Ring buffer: drop the oldest lines beyond the limit
+            line_count = int(self.log_text.index('end-1c').split('.')[0])
+            if line_count > MAX_LOG_LINES:
+                self.log_text.delete('1.0', f'{line_count - MAX_LOG_LINES + 1}.0')
+            self.log_text.see(tk.END)
+        
+        self.root.after(EVENT_TICK_MS, self.drain_events)
     
     def start_scraping(self):
         """Start the scraping process in a separate thread"""
@@ -231,8 +307,8 @@ class OLXScraperGUI:
         self.progress_bar.start(10)
         
         # Clear previous stats
-        self.found_var.set("0")
-        self.page_var.set("0")
+        self.update_progress(found=0, page=0)
+        self.results_table.clear()
         
         # Start scraping thread
         self.current_thread = threading.Thread(
@@ -259,7 +335,16 @@ class OLXScraperGUI:
             self.update_progress("Initializing scraper...")
             
             # Create custom scraper with progress callbacks
-            scraper = OLXScraperWithProgress(self)
+            archive = None
+            if self.archive_var.get():
+                archive_filename = f"{self.filename_prefix_var.get()}_responses.warc.gz"
+                archive = ResponseArchive(os.path.join(self.output_dir_var.get(), archive_filename))
+                self.log(f"Archiving raw responses to: {archive_filename}")
+            dead_letters_filename = f"{self.filename_prefix_var.get()}_dead_letters.json"
+            dead_letters = DeadLetterQueue(os.path.join(self.output_dir_var.get(), dead_letters_filename))
+            dedup = NearDuplicateIndex(skip_details=self.skip_reposts_var.get())
+            scraper = OLXScraperWithProgress(self, archive=archive, dead_letters=dead_letters, dedup=dedup,
+                                             pool=self.http_pool)
             
             # Start basic scraping
             self.update_progress("Scraping basic listings...")
@@ -280,8 +365,7 @@ class OLXScraperGUI:
             basic_filename = f"{self.filename_prefix_var.get()}_basic_{timestamp}.json"
             basic_filepath = os.path.join(self.output_dir_var.get(), basic_filename)
             
-            with open(basic_filepath, 'w', encoding='utf-8') as f:
-                json.dump(listings, f, ensure_ascii=False, indent=2)
+            write_indexed_json(listings, basic_filepath)
             
             self.log(f"Basic listings saved to: {basic_filename}")
             
@@ -299,16 +383,22 @@ class OLXScraperGUI:
                     if not listing.get('url'):
                         continue
                     
+                    if not scraper.needs_details(listing):
+                        self.log(f"Skipping details for listing {i+1}, repost of {listing['duplicate_of']}")
+                        detailed_listings.append(listing)
+                        continue
+                    
                     self.update_progress(f"Getting details {i+1}/{detailed_count}...")
                     self.log(f"Getting details for listing {i+1}/{detailed_count}: {listing.get('title', 'N/A')[:50]}...")
                     
                     try:
-                        details = scraper.get_listing_details(listing['url'])
+                        details = scraper.get_listing_details(listing['url'], listing)
                         detailed_listing = {**listing, **details}
                         detailed_listings.append(detailed_listing)
+                        self.add_results([detailed_listing])
                         
                         # Update progress
-                        self.root.after(0, lambda: self.found_var.set(str(len(detailed_listings))))
+                        self.update_progress(found=len(detailed_listings))
                         
                         # Respectful delay
                         import time
@@ -319,16 +409,26 @@ class OLXScraperGUI:
                         detailed_listings.append(listing)
                         continue
                 
+                # Deferred retry pass for failed detail fetches
+                if self.is_scraping and len(dead_letters):
+                    self.update_progress("Retrying failed detail fetches...")
+                    self.log(f"Retrying failed detail fetches ({len(dead_letters)} queued)...")
+                    recovered = scraper.retry_dead_letters()
+                    detailed_listings = merge_recovered(detailed_listings, recovered)
+                    self.add_results(recovered.values())
+                    self.log(f"Recovered {len(recovered)} listings, {len(dead_letters)} still queued in {dead_letters_filename}")
+                
                 # Save detailed listings
                 if detailed_listings:
                     detailed_filename = f"{self.filename_prefix_var.get()}_detailed_{timestamp}.json"
                     detailed_filepath = os.path.join(self.output_dir_var.get(), detailed_filename)
                     
-                    with open(detailed_filepath, 'w', encoding='utf-8') as f:
-                        json.dump(detailed_listings, f, ensure_ascii=False, indent=2)
+                    write_indexed_json(detailed_listings, detailed_filepath)
                     
                     self.log(f"Detailed listings saved to: {detailed_filename}")
             
+            self.log(f"Connection reuse:\n{self.http_pool.report()}")
+            
             # Final summary
             summary = f"Scraping completed successfully!\n"
             summary += f"Basic listings: {len(listings)}\n"
@@ -366,8 +466,8 @@ class OLXScraperGUI:
 class OLXScraperWithProgress(OLXScraper):
     """Extended scraper class with progress callbacks"""
     
-    def __init__(self, gui):
-        super().__init__()
+    def __init__(self, gui, archive=None, dead_letters=None, dedup=None, pool=None):
+        super().__init__(archive=archive, dead_letters=dead_letters, dedup=dedup, pool=pool)
         self.gui = gui
     
     def _scrape_listings_page(self, url: str):
@@ -378,8 +478,7 @@ class OLXScraperWithProgress(OLXScraper):
         page_num = int(page_match.group(1)) if page_match else 1
         
         # Update progress
-        self.gui.root.after(0, lambda: self.gui.page_var.set(str(page_num)))
-        self.gui.root.after(0, lambda: self.gui.update_progress(f"Scraping page {page_num}..."))
+        self.gui.update_progress(f"Scraping page {page_num}...", page=page_num)
         
         return super()._scrape_listings_page(url)
     
@@ -394,7 +493,7 @@ class OLXScraperWithProgress(OLXScraper):
             self.gui.log(f"Scraping page {page}")
             
             # Add page parameter to URL
-            page_url = f"{url}&page={page}" if '?' in url else f"{url}?page={page}"
+            page_url = with_page(url, page)
             page_listings = self._scrape_listings_page(page_url)
             
             if not page_listings:
@@ -404,11 +503,13 @@ class OLXScraperWithProgress(OLXScraper):
             # Filter out invalid listings
             valid_listings = [l for l in page_listings if l.get('title') != 'N/A' and l.get('url')]
             listings.extend(valid_listings)
+            reposts = self._mark_duplicates(valid_listings)
             
             # Update progress
-            self.gui.root.after(0, lambda: self.gui.found_var.set(str(len(listings))))
+            self.gui.update_progress(found=len(listings))
+            self.gui.add_results(valid_listings)
             
-            self.gui.log(f"Page {page}: Found {len(page_listings)} total, {len(valid_listings)} valid listings")
+            self.gui.log(f"Page {page}: Found {len(page_listings)} total, {len(valid_listings)} valid listings, {reposts} likely reposts")
             
             # Respectful delay
             import time
@@ -0,0 +1,267 @@
+import argparse
+import bisect
+import json
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from analytics import load_listings
+from normalize import normalize_text, parse_price, split_location
+from urls import listing_key
+
+# Lower bounds (PLN) of the price facet buckets
+PRICE_BUCKETS = (0, 200, 300, 400, 500, 750, 1000, 1500, 2000)
+
+# Common Polish inflection endings, longest first; query terms are cut back
+# to their stem and matched as prefixes so "ogrzewany" finds "ogrzewane"
+_POLISH_ENDINGS = ('owego', 'owych', 'owymi', 'ego', 'emu', 'ych', 'ymi', 'imi', 'ami', 'ach',
+                   'owi', 'iem', 'om', 'ow', 'ie', 'ej', 'ym', 'im', 'a', 'e', 'i', 'o', 'u', 'y')
+
+# 'do' and 'od' are also everyday prepositions ("do wynajecia", "od zaraz",
+# "do 2 aut"), so they only start a price when a currency follows the number
+_MAX_PRICE_PATTERNS = (
+    re.compile(r'(?:\b(?:under|below|max|ponizej)|<)\s*(\d[\d\s]*)\s*(?:zl|pln)?'),
+    re.compile(r'\bdo\s*(\d[\d\s]*)(?:zl|pln)\b'),
+)
+_MIN_PRICE_PATTERNS = (
+    re.compile(r'(?:\b(?:over|above|min|powyzej)|>)\s*(\d[\d\s]*)\s*(?:zl|pln)?'),
+    re.compile(r'\bod\s*(\d[\d\s]*)(?:zl|pln)\b'),
+)
+
+# Currency words and prepositions that would otherwise become required terms
+_STOP_WORDS = {'zl', 'pln', 'do', 'od', 'w', 'we', 'na', 'z', 'ze', 'i', 'dla', 'przy', 'po', 'za'}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS listings (
+    rowid INTEGER PRIMARY KEY,
+    listing_key TEXT UNIQUE NOT NULL,
+    price REAL,
+    price_bucket INTEGER,
+    city TEXT,
+    district TEXT,
+    seller_type TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_listings_district ON listings(district, price);
+CREATE INDEX IF NOT EXISTS idx_listings_city ON listings(city, price);
+CREATE INDEX IF NOT EXISTS idx_listings_price_bucket ON listings(price_bucket);
+CREATE INDEX IF NOT EXISTS idx_listings_seller_type ON listings(seller_type);
+CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+    title, description, location, attributes,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+'''
+
+
+def price_bucket_label(bucket: int) -> str:
+    """Human readable label for a price bucket number"""
+    low = PRICE_BUCKETS[bucket]
+    if bucket + 1 < len(PRICE_BUCKETS):
+        return f"{low}-{PRICE_BUCKETS[bucket + 1]} zł"
+    return f"{low}+ zł"
+
+
+def stem(token: str) -> str:
+    """Strip one Polish inflection ending, keeping at least four characters"""
+    for ending in _POLISH_ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= 4:
+            return token[:-len(ending)]
+    return token
+
+
+def parse_query(query: str) -> Tuple[List[str], Optional[float], Optional[float]]:
+    """
+    Split a free-text query into search terms and a price range
+
+    "garaż ogrzewany Mokotów under 500 zł" -> (['garaz', 'ogrzewany', 'mokotow'], None, 500.0)
+    """
+    text = normalize_text(query)
+    max_price, text = _take_price(text, _MAX_PRICE_PATTERNS)
+    min_price, text = _take_price(text, _MIN_PRICE_PATTERNS)
+
+    terms = [t for t in re.findall(r'\w+', text) if t not in _STOP_WORDS]
+    return terms, min_price, max_price
+
+
+def _take_price(text: str, patterns) -> Tuple[Optional[float], str]:
+    """Price matched by the first pattern that applies, and the text without it"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return float(re.sub(r'\s', '', match.group(1))), text[:match.start()] + ' ' + text[match.end():]
+    return None, text
+
+
+class SearchIndex:
+    """
+    Incremental full-text and faceted index over scraped listings
+
+    Titles, descriptions, locations and attributes go into an SQLite FTS5
+    table; district, city, price bucket and seller type are plain indexed
+    columns used as facets. Listings are upserted by ID, so basic and
+    detailed records for the same ad merge into one row.
+    """
+
+    def __init__(self, filename: str = 'listings_index.db'):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def add_listings(self, listings: Iterable[Dict]) -> int:
+        """Insert or update listings in one transaction, returning how many were indexed"""
+        count = 0
+        with self.conn:
+            for listing in listings:
+                key = listing_key(listing)
+                if not key:
+                    continue
+                self._upsert(key, listing)
+                count += 1
+        return count
+
+    def _upsert(self, key: str, listing: Dict):
+        """Write one listing to the facet table and the FTS table"""
+        row = self.conn.execute('SELECT rowid, data FROM listings WHERE listing_key = ?', (key,)).fetchone()
+        if row:
+            listing = {**json.loads(row[1]), **listing}
+
+        location = listing.get('detailed_location') if listing.get('location', 'N/A') == 'N/A' else listing.get('location')
+        location = location if location and location != 'N/A' else ''
+        city, district = split_location(location)
+
+        price = parse_price(listing.get('price', ''))
+        if price is None:
+            price = parse_price(listing.get('detailed_price', ''))
+        bucket = bisect.bisect_right(PRICE_BUCKETS, price) - 1 if price is not None else None
+
+        seller_type = listing.get('seller_type')
+        seller_type = normalize_text(seller_type) if seller_type and seller_type != 'N/A' else None
+
+        values = (price, bucket, city, district, seller_type, json.dumps(listing, ensure_ascii=False))
+        if row:
+            rowid = row[0]
+            self.conn.execute('''UPDATE listings SET price = ?, price_bucket = ?, city = ?, district = ?,
+                                 seller_type = ?, data = ? WHERE rowid = ?''', values + (rowid,))
+            self.conn.execute('DELETE FROM listings_fts WHERE rowid = ?', (rowid,))
+        else:
+            cursor = self.conn.execute('''INSERT INTO listings (listing_key, price, price_bucket, city, district,
+                                          seller_type, data) VALUES (?, ?, ?, ?, ?, ?, ?)''', (key,) + values)
+            rowid = cursor.lastrowid
+
+        attributes = listing.get('attributes') or {}
+        self.conn.execute(
+            'INSERT INTO listings_fts (rowid, title, description, location, attributes) VALUES (?, ?, ?, ?, ?)',
+            (rowid,
+             normalize_text(listing.get('detailed_title') or listing.get('title', '')),
+             normalize_text(listing.get('description', '')),
+             normalize_text(location),
+             normalize_text(' '.join(f"{k} {v}" for k, v in attributes.items()))))
+
+    def _where(self, terms: List[str], location: Optional[str], min_price: Optional[float],
+               max_price: Optional[float], seller_type: Optional[str], fts_joined: bool = False) -> Tuple[str, list]:
+        """Build the WHERE clause shared by search() and facets()"""
+        clauses, params = [], []
+        if terms:
+            if fts_joined:
+                clauses.append('listings_fts MATCH ?')
+            else:
+                clauses.append('l.rowid IN (SELECT rowid FROM listings_fts WHERE listings_fts MATCH ?)')
+            params.append(' '.join(f'"{stem(t)}"*' for t in terms))
+        if location:
+            location = normalize_text(location)
+            clauses.append('(l.district = ? OR l.city = ?)')
+            params.extend([location, location])
+        if min_price is not None:
+            clauses.append('l.price >= ?')
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append('l.price <= ?')
+            params.append(max_price)
+        if seller_type:
+            clauses.append('l.seller_type = ?')
+            params.append(normalize_text(seller_type))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def search(self, query: str = '', location: Optional[str] = None, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, seller_type: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """
+        Find listings matching a free-text query and facet filters
+
+        Price limits written in the query ("under 500 zł", "do 500 zł") are
+        used unless min_price/max_price are given explicitly.
+
+        Returns:
+            Listing dictionaries, best text match first (newest first without text)
+        """
+        terms, query_min, query_max = parse_query(query)
+        min_price = query_min if min_price is None else min_price
+        max_price = query_max if max_price is None else max_price
+        where, params = self._where(terms, location, min_price, max_price, seller_type, fts_joined=bool(terms))
+
+        if terms:
+            sql = (f'SELECT l.data FROM listings_fts JOIN listings l ON l.rowid = listings_fts.rowid{where}'
+                   f' ORDER BY bm25(listings_fts) LIMIT ?')
+            params = params + [limit]
+        else:
+            sql = f'SELECT l.data FROM listings l{where} ORDER BY l.rowid DESC LIMIT ?'
+            params = params + [limit]
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def facets(self, query: str = '', location: Optional[str] = None, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, seller_type: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Counts per district, price bucket and seller type for a query"""
+        terms, query_min, query_max = parse_query(query)
+        min_price = query_min if min_price is None else min_price
+        max_price = query_max if max_price is None else max_price
+        where, params = self._where(terms, location, min_price, max_price, seller_type)
+
+        facets = {}
+        for column in ('district', 'price_bucket', 'seller_type'):
+            rows = self.conn.execute(
+                f'SELECT l.{column}, COUNT(*) FROM listings l{where} GROUP BY l.{column} ORDER BY COUNT(*) DESC',
+                params).fetchall()
+            if column == 'price_bucket':
+                facets[column] = {price_bucket_label(v): n for v, n in rows if v is not None}
+            else:
+                facets[column] = {v: n for v, n in rows if v}
+        return facets
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM listings').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Search scraped OLX listings")
+    parser.add_argument('index', help="Index database file")
+    parser.add_argument('query', nargs='?', default='', help="Free-text query, e.g. 'garaż ogrzewany Mokotów under 500 zł'")
+    parser.add_argument('--add', nargs='+', metavar='FILE', help="Index listing JSON files first")
+    parser.add_argument('--location', help="District or city facet")
+    parser.add_argument('--seller-type', help="Seller type facet")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum results")
+    parser.add_argument('--facets', action='store_true', help="Print facet counts")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(args.index)
+    for filename in args.add or []:
+        print(f"Indexed {index.add_listings(load_listings([filename]))} listings from {filename}")
+
+    started = time.perf_counter()
+    results = index.search(args.query, location=args.location, seller_type=args.seller_type, limit=args.limit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{len(results)} results in {elapsed_ms:.1f} ms ({len(index)} listings indexed)")
+    for listing in results:
+        print(f"- {listing.get('price', 'N/A'):>12}  {listing.get('title', 'N/A')[:60]}  [{listing.get('location', '')}]")
+
+    if args.facets:
+        print(json.dumps(index.facets(args.query, location=args.location, seller_type=args.seller_type),
+                         ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
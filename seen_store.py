@@ -0,0 +1,234 @@
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Iterable, Iterator, List
+
+from urls import listing_key
+
+ENTRY = struct.Struct('<Q')
+CHUNK_ENTRIES = 65536
+
+
+def id_hash(listing_id: str) -> int:
+    """64-bit hash of a listing ID; collisions are negligible below billions of IDs"""
+    return int.from_bytes(hashlib.blake2b(listing_id.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _pack(values: List[int]) -> bytes:
+    chunk = array('Q', values)
+    if sys.byteorder == 'big':
+        chunk.byteswap()
+    return chunk.tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    chunk = array('Q')
+    chunk.frombytes(data)
+    if sys.byteorder == 'big':
+        chunk.byteswap()
+    return chunk
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit hashes (double hashing on the two halves)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, h: int) -> Iterator[int]:
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, h: int):
+        for position in self._positions(h):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, h: int) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(h))
+
+
+class SeenIDStore:
+    """
+    Persistent set of listing IDs with memory that does not grow with history
+
+    IDs are kept as a sorted file of 64-bit hashes that is memory-mapped and
+    binary searched, so the OS page cache rather than the Python heap holds
+    the history. New IDs wait in a small buffer and are merged into the file
+    once flush_every of them have accumulated. An optional Bloom filter in
+    front answers most misses without touching the file.
+    """
+
+    def __init__(self, filename: str, bloom_capacity: int = 1_000_000, flush_every: int = 100_000):
+        self.filename = filename
+        self.flush_every = flush_every
+        self.pending = set()
+        self._lock = threading.RLock()
+        self._file = None
+        self._map = None
+        self._count = 0
+        if not os.path.exists(filename):
+            open(filename, 'wb').close()
+        self._open()
+
+        self.bloom = BloomFilter(bloom_capacity) if bloom_capacity else None
+        if self.bloom is not None:
+            for chunk in self._iter_chunks():
+                for h in chunk:
+                    self.bloom.add(h)
+
+    def _open(self):
+        self._file = open(self.filename, 'rb')
+        size = os.path.getsize(self.filename)
+        self._count = size // ENTRY.size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _iter_chunks(self) -> Iterator[array]:
+        """Stream the sorted file in fixed-size chunks"""
+        with open(self.filename, 'rb') as f:
+            while True:
+                data = f.read(CHUNK_ENTRIES * ENTRY.size)
+                if not data:
+                    return
+                yield _unpack(data)
+
+    def _lower_bound(self, h: int, lo: int = 0) -> int:
+        """Index of the first stored hash >= h, searching from lo"""
+        hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ENTRY.unpack_from(self._map, mid * ENTRY.size)[0] < h:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _in_file(self, h: int, lo: int = 0):
+        """(found, position) for one hash"""
+        if self._map is None:
+            return False, 0
+        position = self._lower_bound(h, lo)
+        found = position < self._count and ENTRY.unpack_from(self._map, position * ENTRY.size)[0] == h
+        return found, position
+
+    def _contains_hash(self, h: int) -> bool:
+        if h in self.pending:
+            return True
+        if self.bloom is not None and h not in self.bloom:
+            return False
+        return self._in_file(h)[0]
+
+    def __contains__(self, listing_id: str) -> bool:
+        with self._lock:
+            return self._contains_hash(id_hash(listing_id))
+
+    def contains_many(self, listing_ids: Iterable[str]) -> List[bool]:
+        """
+        Membership of a batch of IDs (a page of listings)
+
+        Hashes are looked up in sorted order, each binary search starting
+        where the previous one ended, so a batch reads each file page once.
+        """
+        hashes = [id_hash(listing_id) for listing_id in listing_ids]
+        result = [False] * len(hashes)
+        with self._lock:
+            candidates = []
+            for i, h in enumerate(hashes):
+                if h in self.pending:
+                    result[i] = True
+                elif self.bloom is None or h in self.bloom:
+                    candidates.append((h, i))
+            position = 0
+            for h, i in sorted(candidates):
+                result[i], position = self._in_file(h, position)
+        return result
+
+    def add(self, listing_id: str) -> bool:
+        """Record an ID, returning True if it was not seen before"""
+        return self.add_many([listing_id]) == 1
+
+    def add_many(self, listing_ids: Iterable[str]) -> int:
+        """Record a batch of IDs, returning how many were new"""
+        added = 0
+        with self._lock:
+            for listing_id in listing_ids:
+                if not listing_id:
+                    continue
+                h = id_hash(listing_id)
+                if self._contains_hash(h):
+                    continue
+                self.pending.add(h)
+                if self.bloom is not None:
+                    self.bloom.add(h)
+                added += 1
+            if len(self.pending) >= self.flush_every:
+                self.flush()
+        return added
+
+    def flush(self):
+        """Merge buffered IDs into the sorted file (streamed, then atomically replaced)"""
+        with self._lock:
+            if not self.pending:
+                return
+            tmp_filename = self.filename + '.tmp'
+            existing = (h for chunk in self._iter_chunks() for h in chunk)
+            with open(tmp_filename, 'wb') as out:
+                buffer = []
+                for h in heapq.merge(existing, sorted(self.pending)):
+                    buffer.append(h)
+                    if len(buffer) >= CHUNK_ENTRIES:
+                        out.write(_pack(buffer))
+                        buffer = []
+                out.write(_pack(buffer))
+            self._close_map()
+            os.replace(tmp_filename, self.filename)
+            self.pending.clear()
+            self._open()
+
+    def close(self):
+        self.flush()
+        self._close_map()
+
+    def __len__(self) -> int:
+        return self._count + len(self.pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or seed a seen-ID store")
+    parser.add_argument('store', help="Seen-ID store file")
+    parser.add_argument('--add', nargs='*', metavar='FILE', help="Record the IDs of listings in these JSON/JSONL files")
+    parser.add_argument('--check', nargs='*', metavar='ID', help="Print whether these listing IDs were seen")
+    args = parser.parse_args()
+
+    store = SeenIDStore(args.store)
+    if args.add:
+        from analytics import load_listings
+        for filename in args.add:
+            ids = [listing_key(listing) for listing in load_listings([filename])]
+            print(f"{filename}: {store.add_many(ids)} new IDs")
+    for listing_id, seen in zip(args.check or [], store.contains_many(args.check or [])):
+        print(f"{listing_id}: {'seen' if seen else 'new'}")
+    store.close()
+    print(f"{len(store)} IDs in {args.store} ({os.path.getsize(args.store) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
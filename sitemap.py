@@ -0,0 +1,155 @@
+import gzip
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+
+import requests
+
+from urls import canonical_listing_url, listing_id
+
+# Only detail pages are worth fetching; category and search pages are not ads
+DEFAULT_LISTING_PATTERN = r'/d/oferta/|/oferta/'
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """Parse a sitemap <lastmod> (W3C datetime) into an aware UTC datetime"""
+    if not value:
+        return None
+    value = value.strip().replace('Z', '+00:00')
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value[:10], '%Y-%m-%d')
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def parse_since(value: str) -> datetime:
+    """'7d', '12h' or an ISO date -> aware UTC datetime"""
+    match = re.fullmatch(r'(\d+)([dh])', value.strip())
+    if match:
+        amount = int(match.group(1))
+        delta = timedelta(days=amount) if match.group(2) == 'd' else timedelta(hours=amount)
+        return datetime.now(timezone.utc) - delta
+    since = parse_lastmod(value)
+    if since is None:
+        raise ValueError(f"Cannot parse date: {value}")
+    return since
+
+
+class SitemapReader:
+    """
+    Streams listing URLs out of XML sitemaps
+
+    Responses are read as a stream and parsed with iterparse, clearing each
+    element once handled, so memory stays flat even for sitemap files with
+    tens of thousands of entries. Sitemap indexes are followed recursively
+    and children whose lastmod is older than `since` are skipped unread.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, timeout: int = 30):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.stats = {'sitemaps': 0, 'bytes': 0, 'urls': 0, 'failed': 0}
+
+    def discover(self, base_url: str = "https://www.olx.pl") -> List[str]:
+        """Sitemap URLs listed in robots.txt"""
+        response = self.session.get(base_url.rstrip('/') + '/robots.txt', timeout=self.timeout)
+        response.raise_for_status()
+        return [line.split(':', 1)[1].strip() for line in response.text.splitlines()
+                if line.lower().startswith('sitemap:')]
+
+    def iter_entries(self, sitemap_url: str, since: Optional[datetime] = None) -> Iterator[Tuple[str, Optional[datetime]]]:
+        """
+        Yield (loc, lastmod) for every URL entry, following sitemap indexes
+
+        A sitemap that cannot be fetched or parsed is logged and counted in
+        stats['failed']; the remaining sitemaps are still read.
+        """
+        child_sitemaps = []
+        try:
+            for tag, loc, lastmod in self._iter_elements(sitemap_url):
+                if since is not None and lastmod is not None and lastmod < since:
+                    continue
+                if tag == 'sitemap':
+                    child_sitemaps.append(loc)
+                else:
+                    self.stats['urls'] += 1
+                    yield loc, lastmod
+        except (requests.RequestException, ET.ParseError, OSError) as e:
+            print(f"Skipping sitemap {sitemap_url}: {e}")
+            self.stats['failed'] += 1
+
+        for child in child_sitemaps:
+            yield from self.iter_entries(child, since)
+
+    def iter_listing_urls(self, sitemap_url: str, since: Optional[datetime] = None,
+                          pattern: str = DEFAULT_LISTING_PATTERN) -> Iterator[str]:
+        """Yield canonical, deduplicated listing URLs from a sitemap tree"""
+        url_filter = re.compile(pattern)
+        seen = set()
+        for loc, _ in self.iter_entries(sitemap_url, since):
+            if not url_filter.search(loc):
+                continue
+            url = canonical_listing_url(loc)
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+    def _iter_elements(self, sitemap_url: str) -> Iterator[Tuple[str, str, Optional[datetime]]]:
+        """Stream one sitemap file, yielding ('url' | 'sitemap', loc, lastmod)"""
+        print(f"Reading sitemap: {sitemap_url}")
+        self.stats['sitemaps'] += 1
+        response = self.session.get(sitemap_url, timeout=self.timeout, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+
+        stream = _CountingReader(response.raw, self.stats)
+        content_type = response.headers.get('Content-Type', '')
+        if sitemap_url.endswith('.gz') or 'gzip' in content_type:
+            stream = gzip.GzipFile(fileobj=stream)
+
+        try:
+            loc = lastmod = None
+            for _, elem in ET.iterparse(stream, events=('end',)):
+                # Strip the sitemap namespace: '{http://...}loc' -> 'loc'
+                tag = elem.tag.rsplit('}', 1)[-1]
+                if tag == 'loc':
+                    loc = (elem.text or '').strip()
+                elif tag == 'lastmod':
+                    lastmod = parse_lastmod(elem.text)
+                elif tag in ('url', 'sitemap'):
+                    if loc:
+                        yield tag, loc, lastmod
+                    loc = lastmod = None
+                    elem.clear()
+        finally:
+            response.close()
+
+
+class _CountingReader:
+    """File-like wrapper counting bytes read from the network"""
+
+    def __init__(self, raw, stats):
+        self.raw = raw
+        self.stats = stats
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.stats['bytes'] += len(data)
+        return data
+
+
+def listings_from_urls(urls: Iterator[str], limit: int) -> List[dict]:
+    """Stub listings for the detail fetcher from discovered URLs"""
+    listings = []
+    for url in urls:
+        listings.append({'id': listing_id(url), 'url': url})
+        if len(listings) >= limit:
+            break
+    return listings
@@ -0,0 +1,107 @@
+import argparse
+import json
+from typing import Dict, Iterator, List, Optional
+
+from urls import listing_key
+
+# Fields compared between runs; anything else (image_url, date) is too noisy
+DIFF_FIELDS = ('price', 'title', 'location')
+
+
+def iter_sorted_listings(filename: str) -> Iterator[Dict]:
+    """Yield listings from a snapshot file ordered by listing key"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        listings = json.load(f)
+
+    keyed = [(listing_key(l), l) for l in listings if listing_key(l)]
+    keyed.sort(key=lambda item: item[0])
+
+    previous_key = None
+    for key, listing in keyed:
+        # Keep the first occurrence if a run captured the same ad twice
+        if key == previous_key:
+            continue
+        previous_key = key
+        yield listing
+
+
+def diff_listings(old: Iterator[Dict], new: Iterator[Dict]) -> Iterator[Dict]:
+    """
+    Merge two key-sorted listing streams and yield change records
+
+    Both iterators must be sorted by listing_key. Each side is advanced
+    once, so the diff is a single linear pass.
+
+    Yields:
+        Dicts with 'change' set to 'added', 'removed' or 'changed'
+    """
+    old_iter, new_iter = iter(old), iter(new)
+    old_item = next(old_iter, None)
+    new_item = next(new_iter, None)
+
+    while old_item is not None or new_item is not None:
+        old_key = listing_key(old_item) if old_item is not None else None
+        new_key = listing_key(new_item) if new_item is not None else None
+
+        if new_key is None or (old_key is not None and old_key < new_key):
+            yield _change_record('removed', old_item)
+            old_item = next(old_iter, None)
+        elif old_key is None or new_key < old_key:
+            yield _change_record('added', new_item)
+            new_item = next(new_iter, None)
+        else:
+            fields = {}
+            for field in DIFF_FIELDS:
+                if old_item.get(field) != new_item.get(field):
+                    fields[field] = [old_item.get(field), new_item.get(field)]
+            if fields:
+                record = _change_record('changed', new_item)
+                record['fields'] = fields
+                yield record
+            old_item = next(old_iter, None)
+            new_item = next(new_iter, None)
+
+
+def _change_record(change: str, listing: Dict) -> Dict:
+    """Build a compact change log entry"""
+    return {
+        'change': change,
+        'id': listing_key(listing),
+        'url': listing.get('url', ''),
+    }
+
+
+def diff_snapshot_files(old_filename: str, new_filename: str) -> Iterator[Dict]:
+    """Diff two parking_listings_basic_*.json snapshots"""
+    return diff_listings(iter_sorted_listings(old_filename), iter_sorted_listings(new_filename))
+
+
+def urls_to_refetch(changes: List[Dict]) -> List[str]:
+    """Return detail page URLs that are new or changed since the previous run"""
+    return [c['url'] for c in changes if c['change'] in ('added', 'changed') and c.get('url')]
+
+
+def write_change_log(changes: Iterator[Dict], filename: str) -> Dict[str, int]:
+    """Write changes as JSON Lines and return per-type counts"""
+    counts = {'added': 0, 'removed': 0, 'changed': 0}
+    with open(filename, 'w', encoding='utf-8') as f:
+        for change in changes:
+            counts[change['change']] += 1
+            f.write(json.dumps(change, ensure_ascii=False) + '\n')
+    return counts
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Diff two OLX listing snapshots")
+    parser.add_argument('old', help="Previous run's basic listings JSON")
+    parser.add_argument('new', help="Current run's basic listings JSON")
+    parser.add_argument('-o', '--output', default='listing_changes.jsonl', help="Change log output file")
+    args = parser.parse_args(argv)
+
+    counts = write_change_log(diff_snapshot_files(args.old, args.new), args.output)
+    print(f"Added: {counts['added']}, removed: {counts['removed']}, changed: {counts['changed']}")
+    print(f"Change log saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import http.server
+import socket
+import threading
+
+import pytest
+
+from http_pool import HTTPClientPool
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ClosingHandler(KeepAliveHandler):
+    # HTTP/1.0 closes the connection after every response
+    protocol_version = 'HTTP/1.0'
+
+
+def serve(handler):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+@pytest.mark.parametrize('handler, connections', [(KeepAliveHandler, 1), (ClosingHandler, 5)])
+def test_stats_count_real_connections(handler, connections):
+    server, url = serve(handler)
+    pool = HTTPClientPool(dns_ttl=60)
+    try:
+        for _ in range(5):
+            pool.session.get(url, timeout=5).raise_for_status()
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+
+    stats = pool.stats()['http://127.0.0.1']
+    assert stats['requests'] == 5
+    assert stats['connections'] == connections
+    assert pool.dns_cache.misses == 1
+
+
+def test_dns_cache_is_local_to_the_pool():
+    original = socket.getaddrinfo
+    HTTPClientPool(dns_ttl=60)
+    assert socket.getaddrinfo is original
+    assert HTTPClientPool(dns_ttl=0).dns_cache is None
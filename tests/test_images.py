@@ -0,0 +1,57 @@
+import os
+
+from images import ImageCache, ImagePipeline
+from urls import listing_key
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        return FakeResponse(url.encode('utf-8'))
+
+
+def test_repost_reuses_the_originals_images(tmp_path):
+    original = {'url': 'https://www.olx.pl/d/oferta/garaz-CID3-IDabc12.html',
+                'image_url': 'https://ireland.apollo.olxcdn.com/v1/files/original-photo/image'}
+    repost = {'url': 'https://www.olx.pl/d/oferta/garaz-CID3-IDdef34.html',
+              'image_url': 'https://ireland.apollo.olxcdn.com/v1/files/reuploaded-photo/image',
+              'duplicate_of': listing_key(original)}
+    session = FakeSession()
+    cache = ImageCache(str(tmp_path / 'cache'))
+    pipeline = ImagePipeline(cache, session=session, rate_per_second=0, thumbnails=False)
+
+    pipeline.process([original, repost])
+
+    assert session.requested == [original['image_url']]
+    assert repost['image_hashes'] == original['image_hashes'] != []
+
+    # The original is remembered across runs
+    later_repost = dict(repost, image_hashes=None)
+    ImagePipeline(ImageCache(str(tmp_path / 'cache')), session=session, rate_per_second=0,
+                  thumbnails=False).process([later_repost])
+    assert len(session.requested) == 1
+    assert later_repost['image_hashes'] == original['image_hashes']
+
+
+def test_thumbnails_count_towards_the_size_limit(tmp_path):
+    cache = ImageCache(str(tmp_path / 'cache'), max_bytes=150)
+    digest = cache.store('https://ireland.apollo.olxcdn.com/v1/files/a/image', b'x' * 100)
+    with open(cache.thumbnail_path(digest), 'wb') as f:
+        f.write(b't' * 100)
+    cache.add_thumbnail(digest)
+    assert cache.total_bytes == 200
+
+    cache.evict()
+    assert cache.total_bytes == 0
+    assert not os.path.exists(cache.thumbnail_path(digest))
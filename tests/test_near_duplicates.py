@@ -0,0 +1,27 @@
+import os
+
+from bs4 import BeautifulSoup
+
+from main import OLXScraper
+from near_duplicates import NearDuplicateIndex, listing_features
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'debug_page.html')
+PLACEHOLDER = '/app/static/media/no_thumbnail.15f456ec5.svg'
+
+
+def test_fixture_page_ads_are_not_linked():
+    with open(FIXTURE, encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    listings = OLXScraper()._parse_listings_page(soup)
+    assert sum(l.get('image_url') == PLACEHOLDER for l in listings) > len(listings) // 2
+
+    assert NearDuplicateIndex().mark(listings) == 0
+    assert not any(l.get('duplicate_of') for l in listings)
+
+
+def test_placeholder_image_is_not_a_feature():
+    listing = {'id': '1', 'title': 'Garaż Mokotów', 'price': '400 zł', 'image_url': PLACEHOLDER}
+    assert not any(feature.startswith('i:') for feature, _ in listing_features(listing))
+
+    photo = 'https://ireland.apollo.olxcdn.com:443/v1/files/abc-PL/image;s=216x152;q=50'
+    assert ('i:/v1/files/abc-PL/image', 3) in listing_features({**listing, 'image_url': photo})
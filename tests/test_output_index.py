@@ -0,0 +1,18 @@
+import json
+
+from output_index import OutputIndex, build_index
+
+
+def test_old_output_is_indexed_by_url_derived_id(tmp_path):
+    # Output written before the ID fix stores the category number as 'id'
+    output = tmp_path / 'parking_listings_basic_old.json'
+    output.write_text(json.dumps([
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html', 'price': '400 zł'},
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-wola-CID3-IDdef34.html', 'price': '350 zł'},
+    ], ensure_ascii=False, indent=2), encoding='utf-8')
+
+    assert build_index(str(output)) == 2
+    index = OutputIndex([str(output)])
+    assert len(index) == 2
+    assert index.get('def34')['price'] == '350 zł'
+    index.close()
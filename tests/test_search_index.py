@@ -0,0 +1,32 @@
+import pytest
+
+from search_index import SearchIndex, parse_query
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("garaż ogrzewany Mokotów under 500 zł", (['garaz', 'ogrzewany', 'mokotow'], None, 500.0)),
+    ("garaż do 500 zł", (['garaz'], None, 500.0)),
+    ("garaż od 300 zł do 1 200 pln", (['garaz'], 300.0, 1200.0)),
+    ("garaż < 500", (['garaz'], None, 500.0)),
+    ("garaż powyżej 400", (['garaz'], 400.0, None)),
+    # Prepositions, not prices
+    ("miejsce postojowe od zaraz do 2 aut", (['miejsce', 'postojowe', 'zaraz', '2', 'aut'], None, None)),
+    ("garaż do wynajęcia", (['garaz', 'wynajecia'], None, None)),
+])
+def test_parse_query(query, expected):
+    assert parse_query(query) == expected
+
+
+def test_old_output_with_category_ids_indexes_every_listing(tmp_path):
+    index = SearchIndex(str(tmp_path / 'index.db'))
+    # Output written before the ID fix stores the category number as 'id'
+    indexed = index.add_listings([
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html',
+         'title': 'Garaż Mokotów', 'price': '400 zł', 'location': 'Warszawa, Mokotów'},
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-wola-CID3-IDdef34.html',
+         'title': 'Garaż Wola', 'price': '350 zł', 'location': 'Warszawa, Wola'},
+    ])
+
+    assert indexed == 2
+    assert len(index) == 2
+    index.close()
@@ -0,0 +1,23 @@
+import json
+import sys
+
+import seen_store
+from seen_store import SeenIDStore
+
+
+def test_seeding_from_old_output_records_every_listing(tmp_path, monkeypatch):
+    # Output written before the ID fix stores the category number as 'id'
+    output = tmp_path / 'parking_listings_basic_old.json'
+    output.write_text(json.dumps([
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html'},
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-wola-CID3-IDdef34.html'},
+    ]), encoding='utf-8')
+    store_file = str(tmp_path / 'seen.bin')
+    monkeypatch.setattr(sys, 'argv', ['seen_store.py', store_file, '--add', str(output)])
+
+    seen_store.main()
+
+    store = SeenIDStore(store_file)
+    assert len(store) == 2
+    assert store.contains_many(['abc12', 'def34', '3']) == [True, True, False]
+    store.close()
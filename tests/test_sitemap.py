@@ -0,0 +1,73 @@
+import gzip
+import http.server
+import threading
+from datetime import datetime, timezone
+from functools import partial
+
+import pytest
+
+from cli import build_parser
+from sitemap import SitemapReader
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+SINCE = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def sitemap_server(tmp_path):
+    """Serve a sitemap index with a gzipped child, a stale child and a missing child"""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=str(tmp_path)))
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    (tmp_path / 'sitemap.xml').write_text(f'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex {NS}>
+  <sitemap><loc>{base}/missing.xml</loc><lastmod>2024-05-02</lastmod></sitemap>
+  <sitemap><loc>{base}/listings.xml.gz</loc><lastmod>2024-05-02T10:00:00Z</lastmod></sitemap>
+  <sitemap><loc>{base}/stale.xml</loc><lastmod>2023-01-01</lastmod></sitemap>
+</sitemapindex>''', encoding='utf-8')
+    (tmp_path / 'listings.xml.gz').write_bytes(gzip.compress(f'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://www.olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html</loc><lastmod>2024-05-02T08:00:00+02:00</lastmod></url>
+  <url><loc>https://olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html;promoted</loc><lastmod>2024-05-02</lastmod></url>
+  <url><loc>https://www.olx.pl/d/oferta/garaz-wola-CID3-IDold99.html</loc><lastmod>2024-04-01</lastmod></url>
+  <url><loc>https://www.olx.pl/d/oferta/iphone-CID99-IDphone1.html</loc><lastmod>2024-05-03</lastmod></url>
+  <url><loc>https://www.olx.pl/nieruchomosci/</loc><lastmod>2024-05-03</lastmod></url>
+</urlset>'''.encode('utf-8')))
+    (tmp_path / 'stale.xml').write_text(f'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://www.olx.pl/d/oferta/garaz-stary-CID3-IDstale1.html</loc></url>
+</urlset>''', encoding='utf-8')
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def test_listing_urls_filtered_by_lastmod_and_canonicalized(sitemap_server):
+    reader = SitemapReader()
+    urls = list(reader.iter_listing_urls(f"{sitemap_server}/sitemap.xml", since=SINCE, pattern='-CID3-'))
+
+    assert urls == ['https://www.olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html']
+    # The stale child is skipped without being fetched
+    assert reader.stats['sitemaps'] == 3
+
+
+def test_failed_child_sitemap_is_skipped(sitemap_server):
+    reader = SitemapReader()
+    urls = list(reader.iter_listing_urls(f"{sitemap_server}/sitemap.xml", since=SINCE))
+
+    assert reader.stats['failed'] == 1
+    assert 'https://www.olx.pl/d/oferta/iphone-CID99-IDphone1.html' in urls
+
+
+@pytest.mark.parametrize('option', [['--url', 'https://www.olx.pl/'], ['--max-pages', '3'], ['--detailed']])
+def test_sitemap_command_rejects_search_options(option):
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['sitemap'] + option)
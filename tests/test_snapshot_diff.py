@@ -0,0 +1,25 @@
+import json
+
+from snapshot_diff import diff_snapshot_files
+
+
+def write_snapshot(path, listings):
+    path.write_text(json.dumps(listings, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def test_snapshots_with_category_ids_are_matched_by_url(tmp_path):
+    # Snapshots written before the ID fix store the category number as 'id'
+    old = write_snapshot(tmp_path / 'old.json', [
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html', 'price': '400 zł'},
+        {'id': '3', 'url': 'https://www.olx.pl/d/oferta/garaz-wola-CID3-IDdef34.html', 'price': '350 zł'},
+    ])
+    new = write_snapshot(tmp_path / 'new.json', [
+        {'id': 'abc12', 'url': 'https://www.olx.pl/d/oferta/garaz-mokotow-CID3-IDabc12.html', 'price': '450 zł'},
+        {'id': 'def34', 'url': 'https://www.olx.pl/d/oferta/garaz-wola-CID3-IDdef34.html', 'price': '350 zł'},
+    ])
+
+    changes = list(diff_snapshot_files(old, new))
+
+    assert [(c['change'], c['id']) for c in changes] == [('changed', 'abc12')]
+    assert changes[0]['fields'] == {'price': ['400 zł', '450 zł']}
@@ -0,0 +1,56 @@
+from argparse import Namespace
+
+from cli import watch_cycle
+from main import OLXScraper
+from seen_store import SeenIDStore
+
+
+class FakeScraper:
+    def __init__(self):
+        self.pages = []
+
+    def scrape_url(self, url, max_pages=10):
+        return self.pages.pop(0)
+
+
+def listing(listing_id, price):
+    return {'id': listing_id, 'url': f"https://www.olx.pl/d/oferta/garaz-ID{listing_id}.html",
+            'title': 'Garaż', 'price': price, 'location': 'Warszawa, Mokotów'}
+
+
+def test_price_change_is_emitted_with_seen_store(tmp_path):
+    store = SeenIDStore(str(tmp_path / 'seen.bin'))
+    store.add('111')  # emitted by an earlier run
+    args = Namespace(url=['https://www.olx.pl/search'], max_pages=1, max_records=100, seen_ids=store)
+    scraper = FakeScraper()
+    seen = {}
+
+    scraper.pages.append([listing('111', '400 zł'), listing('222', '500 zł')])
+    changes = watch_cycle(scraper, seen, args)
+    assert [(c['id'], c['change']) for c in changes] == [('222', 'added')]
+
+    scraper.pages.append([listing('111', '450 zł'), listing('222', '500 zł')])
+    changes = watch_cycle(scraper, seen, args)
+    assert [(c['id'], c['change'], c['price']) for c in changes] == [('111', 'changed', '450 zł')]
+    store.close()
+
+
+def scraper_with_pages(store, pages):
+    scraper = OLXScraper(seen_ids=store)
+    scraper._scrape_listings_page = lambda page_url: pages.pop(0) if pages else []
+    scraper._sleep = lambda seconds: None
+    return scraper
+
+
+def test_pagination_stops_at_a_seen_page_only_when_newest_first(tmp_path):
+    store = SeenIDStore(str(tmp_path / 'seen.bin'))
+    store.add('111')
+    newest_first = 'https://www.olx.pl/garaze/?search%5Border%5D=created_at:desc'
+    by_price = 'https://www.olx.pl/garaze/?search%5Border%5D=filter_float_price:asc'
+
+    scraper = scraper_with_pages(store, [[listing('111', '400 zł')], [listing('222', '500 zł')]])
+    assert scraper.scrape_url(newest_first, max_pages=2) == []
+
+    scraper = scraper_with_pages(store, [[listing('111', '400 zł')], [listing('222', '500 zł')]])
+    assert [l['id'] for l in scraper.scrape_url(by_price, max_pages=2)] == ['222']
+    store.close()
@@ -0,0 +1,123 @@
+import re
+import threading
+from urllib.parse import unquote, urljoin, urlsplit, urlunsplit
+
+BASE_URL = "https://www.olx.pl"
+
+# Hosts that serve the same ad under different names
+_HOST_ALIASES = {
+    'olx.pl': 'www.olx.pl',
+    'm.olx.pl': 'www.olx.pl',
+    'otodom.pl': 'www.otodom.pl',
+}
+
+_ID_PATTERNS = (
+    re.compile(r'ID([a-zA-Z0-9]+)\.html'),
+    re.compile(r'ID([a-zA-Z0-9]+)'),
+    re.compile(r'-([a-zA-Z0-9]+)\.html'),
+)
+
+
+def canonical_listing_url(url: str, base_url: str = BASE_URL) -> str:
+    """
+    Normalize a listing URL so the same ad always has the same URL
+
+    Makes the URL absolute and https, lowercases and unaliases the host,
+    and drops the query string, fragment and path suffixes such as
+    ';promoted' that only carry tracking information.
+    """
+    if not url:
+        return ''
+    scheme, netloc, path, _, _ = urlsplit(urljoin(base_url, url.strip()))
+    netloc = netloc.lower()
+    netloc = _HOST_ALIASES.get(netloc, netloc)
+    # ';promoted', ';s=...' and similar path parameters
+    path = path.split(';', 1)[0]
+    return urlunsplit(('https' if scheme in ('http', 'https') else scheme, netloc, path, '', ''))
+
+
+def listing_image_url(url: str, base_url: str = BASE_URL) -> str:
+    """
+    Absolute URL of a listing photo, or '' if the URL is not one
+
+    Results pages render most cards with a relative lazy-load placeholder
+    (/app/static/media/no_thumbnail...svg); only images served by the OLX
+    CDN are actual photos of the listing.
+    """
+    if not url or 'no_thumbnail' in url:
+        return ''
+    url = urljoin(base_url, url.strip())
+    host = urlsplit(url).hostname or ''
+    return url if host.endswith('olxcdn.com') else ''
+
+
+def listing_id(url: str) -> str:
+    """Extract the listing ID from a (canonical or raw) listing URL"""
+    path = urlsplit(url).path if url else ''
+    for pattern in _ID_PATTERNS:
+        match = pattern.search(path)
+        if match:
+            return match.group(1)
+    return ""
+
+
+def listing_key(listing: dict) -> str:
+    """
+    Key a listing is matched on across runs, stores and indexes
+
+    The ID is derived from the URL again rather than read from 'id':
+    output written before the ID extraction was fixed stores the category
+    number there ('3' for garages) for every listing. A URL without an ID
+    is its own key.
+    """
+    url = listing.get('url') or ''
+    return listing_id(url) or canonical_listing_url(url)
+
+
+def is_newest_first(url: str) -> bool:
+    """True for search URLs sorted by creation date, newest first"""
+    return 'search[order]=created_at:desc' in unquote(urlsplit(url).query)
+
+
+def with_page(url: str, page: int) -> str:
+    """
+    Return a search URL pointing at the given results page
+
+    An existing page parameter is replaced; the rest of the query string is
+    kept byte for byte so encoded filters like search%5Border%5D survive.
+    """
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    params = [p for p in query.split('&') if p and not p.startswith('page=')]
+    params.append(f"page={page}")
+    return urlunsplit((scheme, netloc, path, '&'.join(params), fragment))
+
+
+class Frontier:
+    """
+    Thread-safe set of canonical URLs already scheduled in this run
+
+    add() returns True only the first time a URL is seen, so every entry
+    point that checks it fetches each URL at most once.
+    """
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def add(self, url: str) -> bool:
+        url = canonical_listing_url(url)
+        with self._lock:
+            if url in self._seen:
+                return False
+            self._seen.add(url)
+            return True
+
+    def __contains__(self, url: str) -> bool:
+        return canonical_listing_url(url) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
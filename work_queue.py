@@ -0,0 +1,270 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from main import OLXScraper
+from urls import listing_key, with_page
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    dedup_key TEXT UNIQUE NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    listing_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+'''
+
+
+class WorkQueue(ABC):
+    """
+    Lease-based task queue shared by crawl workers
+
+    A worker leases a task for a fixed time; if it crashes, the lease runs
+    out and another worker picks the task up. Tasks are deduplicated by key
+    and results are merged by listing ID, so re-running a task is harmless.
+    Subclass this for a networked store; SQLiteWorkQueue is the local one.
+    """
+
+    @abstractmethod
+    def enqueue(self, kind: str, dedup_key: str, payload: Dict) -> bool:
+        """Add a task unless one with the same key exists; True if added"""
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Dict]:
+        """
+        Claim the oldest pending or expired task, or None if there is none
+
+        An expired lease means the worker died without calling fail(); once
+        such a task has used max_attempts it is marked failed, not re-leased.
+        """
+
+    @abstractmethod
+    def complete(self, task_id: int, worker_id: str):
+        """Mark a leased task done"""
+
+    @abstractmethod
+    def fail(self, task_id: int, worker_id: str, error: Exception, max_attempts: int):
+        """Release a task for retry, or mark it failed after max_attempts"""
+
+    @abstractmethod
+    def store_result(self, listing: Dict):
+        """Merge a listing into the results by ID"""
+
+    @abstractmethod
+    def results(self) -> List[Dict]:
+        """All merged listings"""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per status"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """WorkQueue backed by one SQLite file, shared by local processes"""
+
+    def __init__(self, filename: str = 'crawl_queue.db'):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def enqueue(self, kind: str, dedup_key: str, payload: Dict) -> bool:
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO tasks (kind, dedup_key, payload) VALUES (?, ?, ?)',
+            (kind, dedup_key, json.dumps(payload, ensure_ascii=False)))
+        return cursor.rowcount > 0
+
+    def lease(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Dict]:
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can
+        # never select and claim the same row
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            # A task that keeps killing its worker never reaches fail()
+            self.conn.execute(
+                '''UPDATE tasks SET status = 'failed', lease_owner = NULL, lease_expires = NULL,
+                   error = 'Lease expired on every attempt' WHERE status = 'leased'
+                   AND lease_expires < ? AND attempts >= ?''', (now, max_attempts))
+            row = self.conn.execute(
+                '''SELECT id, kind, payload, attempts FROM tasks
+                   WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) AND attempts < ?
+                   ORDER BY id LIMIT 1''', (now, max_attempts)).fetchone()
+            if row is None:
+                self.conn.execute('COMMIT')
+                return None
+            self.conn.execute(
+                '''UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                   attempts = attempts + 1 WHERE id = ?''', (worker_id, now + lease_seconds, row[0]))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return {'id': row[0], 'kind': row[1], 'payload': json.loads(row[2]), 'attempts': row[3] + 1}
+
+    def complete(self, task_id: int, worker_id: str):
+        # A worker whose lease expired and was re-leased must not overwrite the new owner
+        self.conn.execute(
+            "UPDATE tasks SET status = 'done', lease_owner = NULL, error = NULL WHERE id = ? AND lease_owner = ?",
+            (task_id, worker_id))
+
+    def fail(self, task_id: int, worker_id: str, error: Exception, max_attempts: int):
+        self.conn.execute(
+            '''UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+               lease_owner = NULL, lease_expires = NULL, error = ? WHERE id = ? AND lease_owner = ?''',
+            (max_attempts, f"{type(error).__name__}: {error}"[:500], task_id, worker_id))
+
+    def store_result(self, listing: Dict):
+        key = listing_key(listing)
+        if not key:
+            return
+        # json_patch merges field by field, so basic and detailed records for
+        # the same listing combine no matter which arrives first or how often
+        self.conn.execute(
+            '''INSERT INTO results (listing_key, data, updated_at) VALUES (?, ?, ?)
+               ON CONFLICT(listing_key) DO UPDATE SET
+                   data = json_patch(results.data, excluded.data), updated_at = excluded.updated_at''',
+            (key, json.dumps(listing, ensure_ascii=False), time.time()))
+
+    def results(self) -> List[Dict]:
+        return [json.loads(row[0]) for row in self.conn.execute('SELECT data FROM results ORDER BY listing_key')]
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+
+
+def seed(queue: WorkQueue, url: str, max_pages: int, detailed: bool, crawl: Optional[str] = None) -> bool:
+    """
+    Enqueue the first results page of a search
+
+    Task keys are scoped to a crawl ID (today's date by default), so the
+    same queue file can run the search again tomorrow while duplicates
+    within one crawl are still dropped.
+    """
+    crawl = crawl or time.strftime('%Y-%m-%d')
+    payload = {'url': url, 'page': 1, 'max_pages': max_pages, 'detailed': detailed, 'crawl': crawl}
+    return queue.enqueue('listing_page', f"page:{crawl}:{url}:1", payload)
+
+
+def process_task(queue: WorkQueue, scraper: OLXScraper, task: Dict):
+    """Run one leased task; exceptions propagate so the caller can fail it"""
+    payload = task['payload']
+
+    if task['kind'] == 'listing_page':
+        url, page, crawl = payload['url'], payload['page'], payload.get('crawl', '')
+        page_url = with_page(url, page)
+        listings = scraper._fetch_listings_page(page_url)
+        valid_listings = [l for l in listings if l.get('title') != 'N/A' and l.get('url')]
+        for listing in valid_listings:
+            queue.store_result(listing)
+            if payload['detailed']:
+                queue.enqueue('detail', f"detail:{crawl}:{listing_key(listing)}", {'listing': listing})
+        if valid_listings and page < payload['max_pages']:
+            queue.enqueue('listing_page', f"page:{crawl}:{url}:{page + 1}", {**payload, 'page': page + 1})
+        print(f"Page {page}: {len(valid_listings)} valid listings")
+
+    elif task['kind'] == 'detail':
+        listing = payload['listing']
+        details = scraper._fetch_listing_details(listing['url'])
+        queue.store_result({**listing, **details})
+        print(f"Details: {listing.get('title', 'N/A')[:50]}")
+
+    else:
+        raise ValueError(f"Unknown task kind: {task['kind']}")
+
+
+def run_worker(queue_filename: str, lease_seconds: float = 120, delay: float = 3.0,
+               max_attempts: int = 3, idle_exit: float = 30):
+    """
+    Lease and process tasks until the queue has been empty for idle_exit seconds
+
+    Each worker process opens its own queue connection and scraper session.
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    queue = SQLiteWorkQueue(queue_filename)
+    scraper = OLXScraper()
+    idle_since = None
+
+    while True:
+        task = queue.lease(worker_id, lease_seconds, max_attempts)
+        if task is None:
+            idle_since = idle_since or time.time()
+            if time.time() - idle_since >= idle_exit:
+                print(f"[{worker_id}] Queue idle, exiting")
+                return
+            time.sleep(2)
+            continue
+
+        idle_since = None
+        try:
+            process_task(queue, scraper, task)
+            queue.complete(task['id'], worker_id)
+        except Exception as e:
+            print(f"[{worker_id}] Task {task['id']} failed (attempt {task['attempts']}): {e}")
+            queue.fail(task['id'], worker_id, e, max_attempts)
+        time.sleep(delay)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Distributed OLX crawl over a shared work queue")
+    parser.add_argument('queue', help="Queue database file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = subparsers.add_parser('seed', help="Enqueue search URLs")
+    seed_parser.add_argument('urls', nargs='+', help="OLX search URLs")
+    seed_parser.add_argument('--max-pages', type=int, default=20, help="Maximum result pages per URL")
+    seed_parser.add_argument('--detailed', action='store_true', help="Also enqueue detail pages")
+    seed_parser.add_argument('--crawl', help="Crawl ID that scopes task deduplication (default: today's date)")
+
+    work_parser = subparsers.add_parser('work', help="Run worker processes")
+    work_parser.add_argument('--processes', type=int, default=1, help="Worker processes on this machine")
+    work_parser.add_argument('--lease', type=float, default=120, help="Task lease in seconds")
+    work_parser.add_argument('--delay', type=float, default=3.0, help="Seconds each worker waits between tasks")
+    work_parser.add_argument('--idle-exit', type=float, default=30, help="Exit after this many idle seconds")
+
+    export_parser = subparsers.add_parser('export', help="Write merged results to JSON")
+    export_parser.add_argument('output', help="Output JSON file")
+
+    subparsers.add_parser('status', help="Show task counts")
+    args = parser.parse_args(argv)
+
+    if args.command == 'seed':
+        queue = SQLiteWorkQueue(args.queue)
+        for url in args.urls:
+            print(f"{'Seeded' if seed(queue, url, args.max_pages, args.detailed, args.crawl) else 'Already queued'}: {url}")
+
+    elif args.command == 'work':
+        SQLiteWorkQueue(args.queue)  # create the schema before workers race for it
+        processes = [multiprocessing.Process(target=run_worker,
+                                             args=(args.queue, args.lease, args.delay, 3, args.idle_exit))
+                     for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    elif args.command == 'export':
+        results = SQLiteWorkQueue(args.queue).results()
+        OLXScraper().save_to_json(results, args.output)
+
+    print(f"Tasks: {SQLiteWorkQueue(args.queue).counts()}")
+
+
+if __name__ == "__main__":
+    main()